@@ -2,7 +2,8 @@ from __future__ import print_function
 
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_table import Table, Col
+from flask_table import Col
+from flask_table.sqla import QueryTable
 
 
 # Some application and database setup. This should be taken care of
@@ -41,10 +42,15 @@ db.session.add(user2)
 db.session.commit()
 
 
-# Define a table, then pass in the database records
-class UserTable(Table):
+# Define a table, then pass in the query. The table adds the ORDER BY
+# and LIMIT to the query, and only loads the columns that it shows.
+class UserTable(QueryTable):
+    sort_items = True
+    per_page = 10
     username = Col('Username')
     email = Col('Email')
 
-users = User.query.all()
-print(UserTable(items=users).__html__())
+    def page_url(self, page):
+        return '?page={}'.format(page)
+
+print(UserTable(items=User.query, sort_by='email').__html__())
@@ -15,6 +15,8 @@ class SortableTable(Table):
     link = LinkCol(
         'Link', 'flask_link', url_kwargs=dict(id='id'), allow_sort=False)
     allow_sort = True
+    # Have the table sort the items by the sort column itself.
+    sort_items = True
 
     def sort_url(self, col_key, reverse=False):
         if reverse:
@@ -28,7 +30,7 @@ class SortableTable(Table):
 def index():
     sort = request.args.get('sort', 'id')
     reverse = (request.args.get('direction', 'asc') == 'desc')
-    table = SortableTable(Item.get_sorted_by(sort, reverse),
+    table = SortableTable(Item.get_elements(),
                           sort_by=sort,
                           sort_reverse=reverse)
     return table.__html__()
@@ -55,13 +57,6 @@ class Item(object):
             Item(2, 'K', 'aaaaa'),
             Item(3, 'B', 'bbbbb')]
 
-    @classmethod
-    def get_sorted_by(cls, sort, reverse=False):
-        return sorted(
-            cls.get_elements(),
-            key=lambda x: getattr(x, sort),
-            reverse=reverse)
-
     @classmethod
     def get_element_by_id(cls, id):
         return [i for i in cls.get_elements() if i.id == id][0]
@@ -1,4 +1,5 @@
 from .table import Table, create_table
+from .columnar import ColumnarItems
 from .columns import (
     Col,
     BoolCol,
@@ -0,0 +1,156 @@
+"""Async rendering, for Table.aiter_html. This uses async generators, so
+needs Python 3.6 or later, and is only imported when it is used.
+
+"""
+import asyncio
+from inspect import isawaitable, iscoroutinefunction
+
+from .compat import overrides
+from .html import element
+from .table import Table, _RowRenderer, _iter_chunks, _sliced
+
+
+async def aiter_html(table, chunk_rows=None):
+    """Generate the same html as table.iter_html, but asynchronously."""
+    if table._html_overridden():
+        yield table.__html__()
+        return
+
+    chunks = _aiter_tr_chunks(table, chunk_rows or table.chunk_rows)
+    first = await _anext(chunks)
+    for piece, rows_follow in table._iter_framing(first is not None):
+        if not rows_follow:
+            yield piece
+            continue
+        yield '{}\n{}'.format(piece, '\n'.join(first))
+        async for chunk in chunks:
+            yield '\n' + '\n'.join(chunk)
+
+
+async def _anext(agen):
+    try:
+        return await agen.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _aiter_tr_chunks(table, chunk_rows):
+    items = table.items
+    if hasattr(items, '__aiter__'):
+        chunks = _aiter_item_chunks(table, items, chunk_rows)
+    else:
+        chunks = _as_async(_iter_chunks(table.get_items(), chunk_rows))
+    render = _compile_render(table)
+
+    cache = None
+    if overrides(table, Table, 'row_cache_key'):
+        cache = table.get_row_cache()
+    if cache is None:
+        async for chunk in chunks:
+            yield await render(chunk)
+        return
+
+    prefix = table._row_cache_prefix()
+    async for chunk in chunks:
+        keys, trs, missing = table._get_cached_trs(chunk, cache, prefix)
+        if missing:
+            rendered = await render([chunk[i] for i in missing])
+            table._set_cached_trs(
+                keys, trs, missing, rendered, cache, prefix)
+        yield trs
+
+
+async def _as_async(iterable):
+    for value in iterable:
+        yield value
+
+
+async def _aiter_item_chunks(table, items, chunk_rows):
+    """Generate chunks of the items to render from the async iterable
+    items, in the same way as Table.get_items. Unless the table sorts
+    the items itself, each chunk is generated as soon as its items
+    have arrived, and no more items are read than are needed.
+
+    """
+    start, stop = table._get_item_range()
+    sort_key = table.get_sort_key() if table.sort_items else None
+    if sort_key is not None:
+        # We need all of the items before we can sort them.
+        items = table._sorted_page(
+            [item async for item in items], sort_key, stop)
+        if start:
+            items = _sliced(items, start, None)
+        for chunk in _iter_chunks(items, chunk_rows):
+            yield chunk
+        return
+
+    chunk = []
+    i = 0
+    async for item in items:
+        if stop is not None and i >= stop:
+            # There is at least one more item, so there is a next page
+            # (unless it's past the limit).
+            table._has_next_page = table.limit is None or stop < table.limit
+            break
+        if i >= start:
+            chunk.append(item)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        i += 1
+    if chunk:
+        yield chunk
+
+
+def _compile_render(table):
+    """Return an async function that renders a list of items as a list
+    of <tr>s, awaiting any async td_contents (or tr) as it goes.
+
+    """
+    renderer = table._get_row_renderer()
+    if not isinstance(renderer, _RowRenderer):
+        async def render(chunk):
+            return await asyncio.gather(
+                *[_maybe_await(renderer(item)) for item in chunk])
+        return render
+
+    async_cols = [iscoroutinefunction(col.td_contents)
+                  for _, col in renderer.cols]
+    if not any(async_cols):
+        async def render(chunk):
+            return renderer.render(chunk)
+        return render
+
+    async def render(chunk):
+        # Start all of the async cells off together.
+        pending = {}
+        for i, ((attr, col), is_async) in enumerate(
+                zip(renderer.cols, async_cols)):
+            if is_async:
+                attr_list = col.get_attr_list(attr)
+                pending[i] = asyncio.gather(
+                    *[col.td_contents(item, attr_list) for item in chunk])
+        results = dict(zip(
+            pending, await asyncio.gather(*pending.values())))
+
+        columns = []
+        for i, (_, get, tds) in enumerate(renderer.cells):
+            if i in results:
+                td_attrs = renderer.td_attrs[i]
+                columns.append([
+                    element('td', content=content, escape_content=False,
+                            formatted_attrs=td_attrs)
+                    for content in results[i]])
+            elif tds is None:
+                columns.append(get(chunk))
+            else:
+                columns.append(tds([get(item) for item in chunk]))
+        return renderer._trs(columns, len(chunk))
+
+    return render
+
+
+async def _maybe_await(value):
+    if isawaitable(value):
+        return await value
+    return value
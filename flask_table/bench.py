@@ -0,0 +1,352 @@
+"""Benchmarks for rendering tables, to see whether a change makes
+rendering faster or slower. Run with:
+
+python -m flask_table.bench [--rows 1000,100000] [--output out.json]
+
+For each column type, with dict and object rows, and with a plain and
+a dotted attr, this renders a table of each number of rows and
+measures the rows rendered per second (the best of --repeat runs) and
+the peak memory used (with tracemalloc, in a separate run). The
+results are output as JSON, which can be given to --compare in a
+later run to see how the rows per second have changed.
+
+It also builds --tables tables of each column type with create_table
+and add_column, as apps that make their tables on the fly do for each
+request, and measures the tables built per second and the memory that
+each of them takes.
+
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import gc
+import json
+import platform
+import sys
+from datetime import date, datetime, timedelta
+from timeit import default_timer
+
+from flask import Flask
+
+from .columns import (BoolCol, ButtonCol, Col, DateCol, DatetimeCol,
+                      LinkCol, NestedTableCol, OptCol)
+from .table import create_table
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+DEFAULT_ROWS = [1000, 100000]
+DEFAULT_TABLES = 1000
+
+
+class _Row(object):
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+def _make_app():
+    app = Flask(__name__)
+
+    @app.route('/view/<int:id>')
+    def view(id):
+        return ''
+
+    @app.route('/delete/<int:id>', methods=['POST'])
+    def delete(id):
+        return ''
+
+    return app
+
+
+_SubTable = create_table(str('_SubTable')).add_column('x', Col('X'))
+
+_START_DATE = date(2000, 1, 1)
+_START_DATETIME = datetime(2000, 1, 1)
+
+# For each column type, a function that makes the column, given the
+# attr to show, and a function that makes the value for the ith row.
+COLUMNS = [
+    ('Col',
+     lambda attr: Col('Value', attr=attr),
+     lambda i: 'value <{}>'.format(i)),
+    ('OptCol',
+     lambda attr: OptCol('Value', attr=attr,
+                         choices={0: 'zero', 1: 'one', 2: 'two'}),
+     lambda i: i % 4),
+    ('BoolCol',
+     lambda attr: BoolCol('Value', attr=attr),
+     lambda i: i % 2 == 0),
+    ('DateCol',
+     lambda attr: DateCol('Value', attr=attr),
+     lambda i: _START_DATE + timedelta(days=i % 3650)),
+    ('DatetimeCol',
+     lambda attr: DatetimeCol('Value', attr=attr),
+     lambda i: _START_DATETIME + timedelta(minutes=i)),
+    ('LinkCol',
+     lambda attr: LinkCol('Value', 'view', attr=attr,
+                          url_kwargs=dict(id='id')),
+     lambda i: 'link {}'.format(i)),
+    ('ButtonCol',
+     lambda attr: ButtonCol('Value', 'delete', attr=attr,
+                            url_kwargs=dict(id='id')),
+     lambda i: 'delete {}'.format(i)),
+    ('NestedTableCol',
+     lambda attr: NestedTableCol('Value', _SubTable, attr=attr),
+     lambda i: [dict(x=i), dict(x=i + 1)]),
+]
+
+ROW_TYPES = ['dict', 'object']
+ATTRS = ['value', 'a.b.value']
+
+
+def make_items(row_type, attr, num_rows, value):
+    """Return num_rows items of row_type ('dict' or 'object'), each
+    with an id, and value(i) at the (maybe dotted) attr.
+
+    """
+    keys = attr.split('.')
+
+    def make(**kwargs):
+        return kwargs if row_type == 'dict' else _Row(**kwargs)
+
+    items = []
+    for i in range(num_rows):
+        inner = value(i)
+        for key in reversed(keys[1:]):
+            inner = make(**{key: inner})
+        items.append(make(id=i, **{keys[0]: inner}))
+    return items
+
+
+def measure(table, repeat=3, memory=True):
+    """Render table repeat times, and return the best time, the peak
+    memory used (or None) and the size of the html.
+
+    """
+    seconds = None
+    for _ in range(repeat):
+        gc.collect()
+        start = default_timer()
+        html = table.__html__()
+        elapsed = default_timer() - start
+        if seconds is None or elapsed < seconds:
+            seconds = elapsed
+
+    peak_memory = None
+    if memory and tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            table.__html__()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return seconds, peak_memory, len(html)
+
+
+def build_tables(make_col, num_tables):
+    """Return num_tables tables, each with an id column and a column
+    made by make_col.
+
+    """
+    tables = []
+    for _ in range(num_tables):
+        table_cls = create_table(str('BuildTable'))
+        table_cls.add_column('id', Col('Id'))
+        table_cls.add_column('value', make_col('value'))
+        tables.append(table_cls([]))
+    return tables
+
+
+def measure_build(make_col, num_tables, repeat=3, memory=True):
+    """Build num_tables tables repeat times, and return the best time
+    and the memory taken by each table (or None).
+
+    """
+    seconds = None
+    for _ in range(repeat):
+        gc.collect()
+        start = default_timer()
+        build_tables(make_col, num_tables)
+        elapsed = default_timer() - start
+        if seconds is None or elapsed < seconds:
+            seconds = elapsed
+
+    table_memory = None
+    if memory and tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            tables = build_tables(make_col, num_tables)
+            after, _ = tracemalloc.get_traced_memory()
+            table_memory = (after - before) / float(len(tables))
+        finally:
+            tracemalloc.stop()
+    return seconds, table_memory
+
+
+def run(rows=None, columns=None, row_types=None, attrs=None, repeat=3,
+        memory=True, log=None, tables=DEFAULT_TABLES):
+    """Run the benchmarks, and return the results as a dict that can be
+    output as JSON.
+
+    """
+    rows = rows or DEFAULT_ROWS
+    app = _make_app()
+    results = []
+    build_results = []
+    with app.test_request_context():
+        for name, make_col, value in COLUMNS:
+            if columns and name not in columns:
+                continue
+            for row_type in row_types or ROW_TYPES:
+                for attr in attrs or ATTRS:
+                    table_cls = create_table(str('BenchTable'))
+                    table_cls.add_column('id', Col('Id'))
+                    table_cls.add_column('value', make_col(attr))
+                    for num_rows in rows:
+                        items = make_items(row_type, attr, num_rows, value)
+                        seconds, peak_memory, html_bytes = measure(
+                            table_cls(items), repeat, memory)
+                        result = dict(
+                            column=name,
+                            row_type=row_type,
+                            attr=attr,
+                            rows=num_rows,
+                            seconds=seconds,
+                            rows_per_sec=num_rows / seconds,
+                            peak_memory=peak_memory,
+                            html_bytes=html_bytes,
+                        )
+                        results.append(result)
+                        if log is not None:
+                            log(_format_result(result))
+            if tables:
+                seconds, table_memory = measure_build(
+                    make_col, tables, repeat, memory)
+                result = dict(
+                    column=name,
+                    tables=tables,
+                    seconds=seconds,
+                    tables_per_sec=tables / seconds,
+                    table_memory=table_memory,
+                )
+                build_results.append(result)
+                if log is not None:
+                    log(_format_build_result(result))
+    return dict(
+        python=platform.python_version(),
+        implementation=platform.python_implementation(),
+        platform=platform.platform(),
+        results=results,
+        build_results=build_results,
+    )
+
+
+def _result_key(result):
+    return (result['column'], result['row_type'], result['attr'],
+            result['rows'])
+
+
+def _format_result(result, previous=None):
+    line = '{column:<15} {row_type:<7} {attr:<10} {rows:>8} rows: ' \
+        '{rows_per_sec:>11,.0f} rows/s'.format(**result)
+    if result['peak_memory'] is not None:
+        line += ' {:>9.1f} MiB'.format(result['peak_memory'] / 2.0 ** 20)
+    if previous is not None:
+        line += ' ({:+.1%})'.format(
+            result['rows_per_sec'] / previous['rows_per_sec'] - 1)
+    return line
+
+
+def _format_build_result(result, previous=None):
+    line = '{column:<15} build {tables:>8} tables: ' \
+        '{tables_per_sec:>9,.0f} tables/s'.format(**result)
+    if result['table_memory'] is not None:
+        line += ' {:>9,.0f} B/table'.format(result['table_memory'])
+    if previous is not None:
+        line += ' ({:+.1%})'.format(
+            result['tables_per_sec'] / previous['tables_per_sec'] - 1)
+        if (result['table_memory'] is not None and
+                previous['table_memory']):
+            line += ' ({:+.1%} B)'.format(
+                result['table_memory'] / previous['table_memory'] - 1)
+    return line
+
+
+def compare(new, old):
+    """Return lines comparing the rows (and tables built) per second of
+    the results in new with those of the same benchmarks in old.
+
+    """
+    old_results = dict((_result_key(r), r) for r in old['results'])
+    lines = [_format_result(result, old_results.get(_result_key(result)))
+             for result in new['results']]
+    old_builds = dict(
+        (r['column'], r) for r in old.get('build_results', ()))
+    lines.extend(
+        _format_build_result(result, old_builds.get(result['column']))
+        for result in new.get('build_results', ()))
+    return lines
+
+
+def _split(value):
+    return [v for v in value.split(',') if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m flask_table.bench',
+        description='Benchmark rendering tables.')
+    parser.add_argument(
+        '--rows', type=lambda v: [int(n) for n in _split(v)],
+        default=DEFAULT_ROWS,
+        help='comma separated numbers of rows (default: %(default)s)')
+    parser.add_argument(
+        '--columns', type=_split,
+        help='comma separated column types (default: all of them)')
+    parser.add_argument(
+        '--row-types', type=_split, help='dict and/or object')
+    parser.add_argument(
+        '--attrs', type=_split, help='plain and/or dotted attrs')
+    parser.add_argument(
+        '--tables', type=int, default=DEFAULT_TABLES,
+        help='number of tables to build of each column type, or 0 not '
+        'to (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--no-memory', action='store_true',
+        help="don't measure peak memory, which takes an extra run")
+    parser.add_argument(
+        '--output', help='write the JSON results here, not to stdout')
+    parser.add_argument(
+        '--compare', help='JSON results of an earlier run to compare with')
+    args = parser.parse_args(argv)
+
+    def log(line):
+        print(line, file=sys.stderr)
+
+    results = run(
+        rows=args.rows, columns=args.columns, row_types=args.row_types,
+        attrs=args.attrs, repeat=args.repeat, memory=not args.no_memory,
+        log=None if args.compare else log, tables=args.tables)
+
+    if args.compare:
+        with open(args.compare) as f:
+            for line in compare(results, json.load(f)):
+                log(line)
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache(object):
+    """A bounded, thread-safe, in-process cache. Once it holds maxsize
+    entries, setting another discards the least recently used one.
+
+    This is also the interface that any other cache used by the tables
+    needs to provide: get, set, delete and clear.
+
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __getstate__(self):
+        # Only the size is pickled, not the entries or the lock, so a
+        # cache turns up empty in another process.
+        return {'maxsize': self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(state['maxsize'])
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            # Put it back at the end, as the most recently used.
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
@@ -0,0 +1,69 @@
+from itertools import islice
+
+from .compat import zip
+
+
+class ColumnarItems(object):
+    """Items for a table given as columns, rather than as rows. Wraps a
+    mapping of column name to a sequence of values, such as a dict of
+    lists, a dict of NumPy arrays or a pandas DataFrame. All of the
+    columns should be the same length.
+
+    The table binds each of its columns to one of these columns (by
+    the first key of its attr_list) and renders it a chunk at a time,
+    so there is no need to build an object for each row. Iterating
+    over it does still give a dict for each row, for anything that
+    needs whole rows, such as a column that overrides td_contents.
+
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @property
+    def names(self):
+        return list(self.columns)
+
+    def __len__(self):
+        for name in self.columns:
+            return len(self.columns[name])
+        return 0
+
+    def __iter__(self):
+        return iter_rows(self.columns)
+
+    def take(self, indices):
+        """Return new ColumnarItems with just the rows at indices, in
+        that order.
+
+        """
+        columns = {}
+        for name in self.columns:
+            values = list(self.columns[name])
+            columns[name] = [values[i] for i in indices]
+        return ColumnarItems(columns)
+
+    def iter_chunks(self, chunk_rows):
+        """Yield dicts of column name to a list of the next chunk_rows
+        values in that column, until the columns are exhausted.
+
+        """
+        names = self.names
+        iters = [iter(self.columns[name]) for name in names]
+        while names:
+            chunk = dict(
+                (name, list(islice(it, chunk_rows)))
+                for name, it in zip(names, iters))
+            if not chunk[names[0]]:
+                return
+            yield chunk
+
+
+def iter_rows(columns):
+    """Given a mapping of column name to values, yield a dict for each
+    row.
+
+    """
+    names = list(columns)
+    for values in zip(*[columns[name] for name in names]):
+        yield dict(zip(names, values))
@@ -1,41 +1,212 @@
 from __future__ import unicode_literals
 
-from flask import Markup, url_for
-from babel.dates import format_date, format_datetime
-from flask_babel import gettext as _
+from datetime import datetime
 
-from .html import element
+from markupsafe import Markup
 
+from .cache import LRUCache
+from .compat import overrides
+from .compat import zip
+from .html import (
+    element, open_tag, close_tag, escape_many, _attrs_template,
+    _escape_braces, _format_attrs, _format_content)
+from .i18n import (
+    get_time_locale, lazy_gettext, translate, translate_values)
 
-def _single_get(item, key):
-    # First, try to lookup the key as if the item were a dict. If
-    # that fails, lookup the key as an atrribute of an item.
-    try:
-        val = item[key]
-    except (KeyError, TypeError):
-        val = getattr(item, key)
 
-    # once we have the value, try calling it as a function. If
-    # that fails, the just return it.
-    try:
-        return val()
-    except TypeError:
+def _single_getter(key):
+    """Return a function that gets key from an item. First, try to
+    lookup the key as if the item were a dict. If that fails, lookup
+    the key as an atrribute of an item. Once we have the value, if
+    it is callable, try calling it. If that fails, then just return
+    it.
+
+    Whether an item supports item[key] at all is worked out once for
+    each type of item and remembered, so that plain objects go
+    straight to getattr rather than raising and catching a TypeError
+    for every cell.
+
+    """
+    subscriptable = {}
+
+    def get(item):
+        cls = type(item)
+        try:
+            try_getitem = subscriptable[cls]
+        except KeyError:
+            try_getitem = subscriptable[cls] = hasattr(cls, '__getitem__')
+
+        if try_getitem:
+            try:
+                val = item[key]
+            except (KeyError, TypeError):
+                val = getattr(item, key)
+        else:
+            val = getattr(item, key)
+
+        if callable(val):
+            try:
+                return val()
+            except TypeError:
+                return val
         return val
 
+    return get
 
-def _recursive_getattr(item, keys):
+
+def _compile_getter(keys):
+    getters = [_single_getter(key) for key in keys]
+
+    def get(item):
+        for getter in getters:
+            # If we hit a None on the way, then stop and return it.
+            if item is None:
+                return None
+            item = getter(item)
+        return item
+
+    return get
+
+
+_getters = {}
+
+
+def _getter(keys):
+    """Return a function that does the same as
+    _recursive_getattr(item, keys). These are compiled once for each
+    distinct keys and then cached.
+
+    """
     # See if keys is as string, if so, we need to split on the dots.
     try:
-        keys = keys.split('.')
+        split_keys = keys.split('.')
     except AttributeError:
-        pass
+        split_keys = keys
+        keys = tuple(keys)
 
-    if item is None:
-        return None
-    if len(keys) == 1:
-        return _single_get(item, keys[0])
-    else:
-        return _recursive_getattr(_single_get(item, keys[0]), keys[1:])
+    try:
+        return _getters[keys]
+    except KeyError:
+        getter = _getters[keys] = _compile_getter(split_keys)
+        return getter
+
+
+def _recursive_getattr(item, keys):
+    return _getter(keys)(item)
+
+
+def _unescape(value):
+    """Undo the html escaping of value, if it has been escaped into
+    Markup, for exporting as plain text.
+
+    """
+    if isinstance(value, Markup):
+        return value.unescape()
+    return value
+
+
+def _map_distinct(fn, values, key=None):
+    """Return [fn(value) for value in values], but only call fn once for
+    each distinct value, or each distinct key(value) if key is given.
+
+    """
+    out = {}
+    result = []
+    for value in values:
+        k = value if key is None else key(value)
+        try:
+            result.append(out[k])
+        except KeyError:
+            content = out[k] = fn(value)
+            result.append(content)
+        except TypeError:
+            # Unhashable, so just format it.
+            result.append(fn(value))
+    return result
+
+
+_NAMED_FORMATS = ('full', 'long', 'medium', 'short')
+# The date and datetime formatters, by format and locale.
+_formatters = LRUCache(64)
+
+
+def _date_formatter(date_format, locale):
+    """Return a function that does the same as format_date(value,
+    date_format, locale), but with the locale parsed and the pattern
+    looked up just once.
+
+    """
+    key = ('date', date_format, str(locale))
+    formatter = _formatters.get(key)
+    if formatter is None:
+        from babel import Locale
+        from babel.dates import get_date_format, parse_pattern
+        locale = Locale.parse(locale)
+        if date_format in _NAMED_FORMATS:
+            pattern = get_date_format(date_format, locale=locale)
+        else:
+            pattern = parse_pattern(date_format)
+
+        def formatter(value):
+            if isinstance(value, datetime):
+                value = value.date()
+            return pattern.apply(value, locale)
+
+        _formatters.set(key, formatter)
+    return formatter
+
+
+def _datetime_formatter(datetime_format, locale):
+    """Return a function that does the same as format_datetime(value,
+    datetime_format, locale=locale), but with the locale parsed just
+    once. (Babel caches the patterns itself.)
+
+    """
+    key = ('datetime', datetime_format, str(locale))
+    formatter = _formatters.get(key)
+    if formatter is None:
+        from babel import Locale
+        from babel.dates import format_datetime
+        locale = Locale.parse(locale)
+
+        def formatter(value):
+            return format_datetime(value, datetime_format, locale=locale)
+
+        _formatters.set(key, formatter)
+    return formatter
+
+
+def _date_key(value):
+    """Return what distinguishes how value is formatted. Aware datetimes
+    at the same instant in different timezones are equal (and hash the
+    same), but are formatted in their own timezones, so the tzinfo is
+    part of it.
+
+    """
+    return value, getattr(value, 'tzinfo', None)
+
+
+def _format_dates(formatter, values, cache=None, cache_key=None):
+    """Format values with formatter, as the td_format of DateCol and
+    DatetimeCol does, but only format each distinct value once. If
+    there is a cache, then also store the formatted values in it, by
+    cache_key and the value (along with its tzinfo, see _date_key),
+    and use them from there if they're already in it.
+
+    """
+    def td_format(value):
+        if not value:
+            return ''
+        if cache is None:
+            return formatter(value)
+        key = (cache_key, _date_key(value))
+        content = cache.get(key)
+        if content is None:
+            content = formatter(value)
+            cache.set(key, content)
+        return content
+
+    return _map_distinct(td_format, values, _date_key)
 
 
 class Col(object):
@@ -52,15 +223,40 @@ class Col(object):
     will terminate and will not error. However, if item.foo.bar is an
     object without an attribute 'baz', then this will currently error.
 
+    When the table sorts its items, it sorts by the same value, passed
+    through sort_key, if given. None sorts after every other value (so
+    first when sorting in reverse).
+
+    The content is escaped, unless escape=False is passed, which can
+    be used for columns whose values are known to be safe html.
+
+    Passing concurrent=True renders the column's cells in a pool of
+    threads, for columns that are slow because they wait on something,
+    such as a lookup in td_contents, or a NestedTableCol's tables.
+
+    The built in columns use __slots__, as tables made on the fly can
+    create a lot of them. Subclasses that don't set __slots__ still
+    get a __dict__, so can set whatever attributes they like.
+
     """
 
+    __slots__ = (
+        'name', 'escape', 'concurrent', 'sort_key', 'allow_sort',
+        '_counter_val', 'attr_list', 'show',
+        '_td_html_attrs', '_formatted_td_html_attrs',
+        '_th_html_attrs', '_formatted_th_html_attrs')
+
     _counter = 0
 
     def __init__(self, name, attr=None, attr_list=None,
                  allow_sort=True, show=True,
                  th_html_attrs=None, td_html_attrs=None,
-                 column_html_attrs=None):
+                 column_html_attrs=None, escape=True, sort_key=None,
+                 concurrent=False):
         self.name = name
+        self.escape = escape
+        self.concurrent = concurrent
+        self.sort_key = sort_key
         self.allow_sort = allow_sort
         self._counter_val = Col._counter
         self.attr_list = attr_list
@@ -76,6 +272,65 @@ class Col(object):
 
         Col._counter += 1
 
+    def __getstate__(self):
+        # Pickle the slots of each class along with any __dict__, so
+        # that any protocol works.
+        state = dict(getattr(self, '__dict__', ()))
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @property
+    def td_html_attrs(self):
+        return self._td_html_attrs
+
+    @td_html_attrs.setter
+    def td_html_attrs(self, attrs):
+        self._td_html_attrs = attrs
+        self._formatted_td_html_attrs = None
+
+    @property
+    def th_html_attrs(self):
+        return self._th_html_attrs
+
+    @th_html_attrs.setter
+    def th_html_attrs(self, attrs):
+        self._th_html_attrs = attrs
+        self._formatted_th_html_attrs = None
+
+    @property
+    def formatted_td_html_attrs(self):
+        """The td_html_attrs, formatted and escaped ready to go into the
+        <td> tag. This is worked out once and then reused for every
+        cell, until td_html_attrs is changed (or set to something
+        else).
+
+        """
+        attrs = self.td_html_attrs
+        snapshot = tuple(attrs.items())
+        cached = self._formatted_td_html_attrs
+        if cached is None or cached[0] != snapshot:
+            cached = self._formatted_td_html_attrs = (
+                snapshot, _format_attrs(attrs))
+        return cached[1]
+
+    @property
+    def formatted_th_html_attrs(self):
+        """As for formatted_td_html_attrs, but for the th_html_attrs."""
+        attrs = self.th_html_attrs
+        snapshot = tuple(attrs.items())
+        cached = self._formatted_th_html_attrs
+        if cached is None or cached[0] != snapshot:
+            cached = self._formatted_th_html_attrs = (
+                snapshot, _format_attrs(attrs))
+        return cached[1]
+
     def get_attr_list(self, attr):
         if self.attr_list:
             return self.attr_list
@@ -84,6 +339,23 @@ class Col(object):
         else:
             return None
 
+    def get_attr_lists(self, attr):
+        """Return a list of the attr_lists of everything that this
+        column reads from each item, or None if that isn't known, eg
+        because td_contents has been overridden. This is used to work
+        out what needs to be loaded for each item, eg by
+        flask_table.sqla.QueryTable.
+
+        """
+        return self._get_attr_lists(attr, Col)
+
+    def _get_attr_lists(self, attr, base):
+        if any(overrides(self, base, name) for name in [
+                'td', 'td_contents', 'from_attr_list']):
+            return None
+        attr_list = self.get_attr_list(attr)
+        return [attr_list] if attr_list else []
+
     def from_attr_list(self, item, attr_list):
         out = _recursive_getattr(item, attr_list)
         if out is None:
@@ -97,7 +369,134 @@ class Col(object):
             'td',
             content=content,
             escape_content=False,
-            attrs=self.td_html_attrs)
+            formatted_attrs=self.formatted_td_html_attrs)
+
+    def _td_template(self):
+        # Escape any braces in the attributes, as this is used as a
+        # format string.
+        return '{opening}{{}}{closing}'.format(
+            opening=_escape_braces(open_tag(
+                'td', formatted_attrs=self.formatted_td_html_attrs)),
+            closing=close_tag('td'))
+
+    def _render_signature(self):
+        """Return the settings of this column that its compiled rendering
+        is worked out from, so that the table can tell when it needs to
+        compile it again. The dicts are snapshotted, so that changes
+        made to them in place are noticed too.
+
+        """
+        attr_list = self.attr_list
+        return (self.formatted_td_html_attrs, self.concurrent,
+                tuple(attr_list) if attr_list else None)
+
+    def _compile_td(self, attr):
+        """Return a function that, given an item, returns the same as
+        self.td(item, attr), but with as much as possible worked out
+        in advance. Used by the table to build its row renderer.
+
+        """
+        if overrides(self, Col, 'td'):
+            return lambda item: self.td(item, attr)
+
+        attr_list = self.get_attr_list(attr)
+        template = self._td_template()
+
+        if overrides(self, Col, 'td_contents'):
+            td_contents = self.td_contents
+            return lambda item: template.format(
+                _format_content(td_contents(item, attr_list), False))
+
+        td_format = self.td_format
+        from_attr_list = self._compile_from_attr_list(attr_list)
+        if from_attr_list is None:
+            return lambda item: template.format(
+                td_format(self.from_attr_list(item, attr_list)))
+        return lambda item: template.format(td_format(from_attr_list(item)))
+
+    def _compile_sort_key(self, attr):
+        """Return a function that gives the key to sort an item by for
+        this column, from the same attr_list that it displays. Or None
+        if it doesn't display a value from the item to sort by, eg a
+        LinkCol without an attr.
+
+        """
+        attr_list = self.get_attr_list(attr)
+        if not attr_list:
+            return None
+        getter = _getter(attr_list)
+        sort_key = self.sort_key
+
+        def key(item):
+            value = getter(item)
+            # Put None after everything else, without ever comparing
+            # it to another value.
+            if value is None:
+                return (True, None)
+            if sort_key is not None:
+                value = sort_key(value)
+            return (False, value)
+
+        return key
+
+    def _compile_item_tds(self, attr):
+        """Return a function that takes a list of items and returns the
+        list of their <td>s, for columns where _compile_tds can't be
+        used. This gets called for each chunk of rows, so a column
+        can also work out anything that it needs for the current
+        render here.
+
+        """
+        td = self._compile_td(attr)
+        return lambda items: [td(item) for item in items]
+
+    def _compile_tds(self, attr):
+        """For columns whose contents only depend on the value that
+        from_attr_list gets from the item, return a triple of the
+        attr_list, a function to get that value from an item, and a
+        function that takes a list of those values and returns the
+        list of their <td>s. This lets the table render a whole
+        column of a chunk of rows at once.
+
+        Return None if the contents might depend on more than that,
+        ie if td, td_contents or from_attr_list have been overridden.
+
+        """
+        if overrides(self, Col, 'td') or overrides(self, Col, 'td_contents'):
+            return None
+        attr_list = self.get_attr_list(attr)
+        from_attr_list = self._compile_from_attr_list(attr_list)
+        if from_attr_list is None:
+            return None
+
+        template = self._td_template()
+        td_format_many = self.td_format_many
+
+        def tds(values):
+            return [template.format(content)
+                    for content in td_format_many(values)]
+
+        return attr_list, from_attr_list, tds
+
+    def _compile_from_attr_list(self, attr_list):
+        """Return a function that, given an item, returns the same as
+        self.from_attr_list(item, attr_list). Or None if
+        from_attr_list has been overridden, in which case that needs
+        to be called instead.
+
+        """
+        if overrides(self, Col, 'from_attr_list'):
+            return None
+
+        getter = _getter(attr_list)
+
+        def from_attr_list(item):
+            out = getter(item)
+            if out is None:
+                return ''
+            return out
+
+        return from_attr_list
 
     def td_contents(self, item, attr_list):
         """Given an item and an attr, return the contents of the td.
@@ -122,17 +521,90 @@ class Col(object):
         data that attr_list gets from the item, but need to adjust how
         it is represented.
 
-        Note that the output of this function is escaped.
+        Note that the output of this function is escaped (unless the
+        column was created with escape=False).
 
         """
+        if not self.escape:
+            return content
         return Markup.escape(content)
 
+    def td_format_many(self, values):
+        """Given a list of values extracted from some items, return the
+        list of what should appear in each of their tds.
+
+        The table uses this to format a whole chunk of a column at
+        once, so it is the place to override if formatting can be
+        shared across values, such as looking up a format once, or
+        only formatting each distinct value once. It must give the
+        same results as td_format, which is what it does by default,
+        except that the escaping is done for all of the values at once.
+
+        """
+        if overrides(self, Col, 'td_format'):
+            return [self.td_format(value) for value in values]
+        if not self.escape:
+            return list(values)
+        return escape_many(values)
+
+    def export_format(self, content):
+        """Given just the value extracted from the item, return what
+        should be exported for it by Table.iter_csv and
+        Table.iter_jsonl.
+
+        By default, that is the value itself, unless td_format (or
+        td_format_many) has been overridden, in which case it is what
+        that gives, but with any html escaping undone. Override this
+        to export something other than what the table shows.
+
+        """
+        if overrides(self, Col, 'td_format') or overrides(
+                self, Col, 'td_format_many'):
+            return _unescape(self.td_format_many([content])[0])
+        return content
+
+    def export_format_many(self, values):
+        """As export_format, but for a list of values at once, in the
+        same way as td_format_many.
+
+        """
+        if overrides(self, Col, 'export_format'):
+            return [self.export_format(value) for value in values]
+        if overrides(self, Col, 'td_format') or overrides(
+                self, Col, 'td_format_many'):
+            return [_unescape(content)
+                    for content in self.td_format_many(values)]
+        return list(values)
+
+    def _compile_exports(self, attr):
+        """Return a function that takes a list of items and returns the
+        list of what to export for each of them, for Table.iter_csv
+        and Table.iter_jsonl. If td or td_contents have been
+        overridden, then that is the td_contents, with any html
+        escaping undone.
+
+        """
+        attr_list = self.get_attr_list(attr)
+        if overrides(self, Col, 'td') or overrides(self, Col, 'td_contents'):
+            td_contents = self.td_contents
+            return lambda items: [_unescape(td_contents(item, attr_list))
+                                  for item in items]
+
+        get = self._compile_from_attr_list(attr_list)
+        if get is None:
+            def get(item):
+                return self.from_attr_list(item, attr_list)
+        export_format_many = self.export_format_many
+        return lambda items: export_format_many([get(item) for item in items])
+
 
 class OptCol(Col):
     """Translate the contents according to a dictionary of choices.
 
     """
 
+    __slots__ = ('choices', 'default_value', 'coerce_fn')
+
     def __init__(self, name, choices=None, default_key=None, default_value='',
                  coerce_fn=None, **kwargs):
         super(OptCol, self).__init__(name, **kwargs)
@@ -147,6 +619,14 @@ class OptCol(Col):
         # Don't convert None to empty string here.
         return _recursive_getattr(item, attr_list)
 
+    def get_attr_lists(self, attr):
+        return self._get_attr_lists(attr, OptCol)
+
+    def _compile_from_attr_list(self, attr_list):
+        if overrides(self, OptCol, 'from_attr_list'):
+            return None
+        return _getter(attr_list)
+
     def coerce_content(self, content):
         if self.coerce_fn:
             return self.coerce_fn(content)
@@ -154,8 +634,21 @@ class OptCol(Col):
             return content
 
     def td_format(self, content):
-        return self.choices.get(
-            self.coerce_content(content), self.default_value)
+        return translate(self.choices.get(
+            self.coerce_content(content), self.default_value))
+
+    def td_format_many(self, values):
+        if overrides(self, OptCol, 'td_format') or overrides(
+                self, OptCol, 'coerce_content'):
+            return super(OptCol, self).td_format_many(values)
+
+        # Translate any lazy choices once for the chunk, rather than for
+        # each cell.
+        get = translate_values(self.choices).get
+        default_value = translate(self.default_value)
+        if self.coerce_fn:
+            values = map(self.coerce_fn, values)
+        return [get(value, default_value) for value in values]
 
 
 class BoolCol(OptCol):
@@ -163,8 +656,10 @@ class BoolCol(OptCol):
 
     """
 
-    yes_display = _('Yes')
-    no_display = _('No')
+    __slots__ = ()
+
+    yes_display = lazy_gettext('Yes')
+    no_display = lazy_gettext('No')
 
     def __init__(self, name, yes_display=None, no_display=None, **kwargs):
         if yes_display is None:
@@ -178,14 +673,22 @@ class BoolCol(OptCol):
             **kwargs)
 
 
+def _bool_or_none(value):
+    if value is None:
+        return None
+    return bool(value)
+
+
 class BoolNaCol(OptCol):
     """Output Yes/No values for truthy or falsey values, or N/A for None.
 
     """
 
-    yes_display = _('Yes')
-    no_display = _('No')
-    na_display = _('N/A')
+    __slots__ = ()
+
+    yes_display = lazy_gettext('Yes')
+    no_display = lazy_gettext('No')
+    na_display = lazy_gettext('N/A')
 
     def __init__(self, name, yes_display=None, no_display=None,
                  na_display=None, **kwargs):
@@ -196,15 +699,10 @@ class BoolNaCol(OptCol):
         if na_display is None:
             na_display = self.na_display
 
-        def bool_or_none(value):
-            if value is None:
-                return None
-            return bool(value)
-
         super(BoolNaCol, self).__init__(
             name,
             choices={True: yes_display, False: no_display, None: na_display},
-            coerce_fn=bool_or_none,
+            coerce_fn=_bool_or_none,
             **kwargs)
 
 
@@ -212,33 +710,77 @@ class DateCol(Col):
     """Format the content as a date, unless it is None, in which case,
     output empty.
 
+    The locale and format are looked up once for each chunk of
+    rows. Pass format_cache_size to also keep that many formatted
+    dates between renders.
+
     """
-    def __init__(self, name, date_format='short', **kwargs):
+
+    __slots__ = ('date_format', 'format_cache')
+
+    def __init__(self, name, date_format='short', format_cache_size=0,
+                 **kwargs):
         super(DateCol, self).__init__(name, **kwargs)
         self.date_format = date_format
+        self.format_cache = (
+            LRUCache(format_cache_size) if format_cache_size else None)
+
+    def _formatter(self, locale):
+        return _date_formatter(self.date_format, locale)
 
     def td_format(self, content):
         if content:
-            return format_date(content, self.date_format)
+            return self._formatter(get_time_locale())(content)
         else:
             return ''
 
+    def td_format_many(self, values):
+        if overrides(self, DateCol, 'td_format'):
+            return super(DateCol, self).td_format_many(values)
+        locale = get_time_locale()
+        return _format_dates(
+            self._formatter(locale), values,
+            cache=self.format_cache,
+            cache_key=(self.date_format, str(locale)))
+
 
 class DatetimeCol(Col):
     """Format the content as a datetime, unless it is None, in which case,
     output empty.
 
+    The locale is looked up once for each chunk of rows. Pass
+    format_cache_size to also keep that many formatted datetimes
+    between renders.
+
     """
-    def __init__(self, name, datetime_format='short', **kwargs):
+
+    __slots__ = ('datetime_format', 'format_cache')
+
+    def __init__(self, name, datetime_format='short', format_cache_size=0,
+                 **kwargs):
         super(DatetimeCol, self).__init__(name, **kwargs)
         self.datetime_format = datetime_format
+        self.format_cache = (
+            LRUCache(format_cache_size) if format_cache_size else None)
+
+    def _formatter(self, locale):
+        return _datetime_formatter(self.datetime_format, locale)
 
     def td_format(self, content):
         if content:
-            return format_datetime(content, self.datetime_format)
+            return self._formatter(get_time_locale())(content)
         else:
             return ''
 
+    def td_format_many(self, values):
+        if overrides(self, DatetimeCol, 'td_format'):
+            return super(DatetimeCol, self).td_format_many(values)
+        locale = get_time_locale()
+        return _format_dates(
+            self._formatter(locale), values,
+            cache=self.format_cache,
+            cache_key=(self.datetime_format, str(locale)))
+
 
 class LinkCol(Col):
     """Format the content as a link. Requires a endpoint to use to find
@@ -254,6 +796,10 @@ class LinkCol(Col):
     id=item.id) for each item in the iterable.
 
     """
+
+    __slots__ = ('endpoint', '_url_kwargs', '_url_kwargs_extra',
+                 'text_fallback', 'anchor_attrs')
+
     def __init__(self, name, endpoint, attr=None, attr_list=None,
                  url_kwargs=None, url_kwargs_extra=None,
                  anchor_attrs=None, text_fallback=None, **kwargs):
@@ -277,9 +823,43 @@ class LinkCol(Col):
         kwargs.update(item_kwargs)
         return kwargs
 
+    def _compile_url_kwargs(self):
+        getters = [(k, _getter(v)) for k, v in self._url_kwargs.items()]
+        extra = self._url_kwargs_extra
+
+        def url_kwargs(item):
+            kwargs = extra.copy()
+            for k, getter in getters:
+                kwargs[k] = getter(item)
+            return kwargs
+
+        return url_kwargs
+
     def get_attr_list(self, attr):
         return super(LinkCol, self).get_attr_list(None)
 
+    def _overrides_any(self, *names):
+        """Whether a subclass replaces any of the methods names, so that
+        the link can't be rendered in the usual way.
+
+        """
+        return any(overrides(self, LinkCol, name) for name in names)
+
+    def get_attr_lists(self, attr):
+        if self._overrides_any('td', 'td_contents', 'from_attr_list',
+                               'text', 'url', 'url_kwargs'):
+            return None
+        attr_lists = []
+        attr_list = self.get_attr_list(attr)
+        if attr_list:
+            attr_lists.append(attr_list)
+        for keys in self._url_kwargs.values():
+            try:
+                attr_lists.append(keys.split('.'))
+            except AttributeError:
+                attr_lists.append(list(keys))
+        return attr_lists
+
     def text(self, item, attr_list):
         if attr_list:
             return self.from_attr_list(item, attr_list)
@@ -289,14 +869,81 @@ class LinkCol(Col):
             return self.name
 
     def url(self, item):
+        from flask import url_for
         return url_for(self.endpoint, **self.url_kwargs(item))
 
     def td_contents(self, item, attr_list):
-        attrs = dict(href=self.url(item))
+        return self._td_contents(item, attr_list, self.url(item))
+
+    def _td_contents(self, item, attr_list, url):
+        attrs = dict(href=url)
         attrs.update(self.anchor_attrs)
         text = self.td_format(self.text(item, attr_list))
         return element('a', attrs=attrs, content=text, escape_content=False)
 
+    def _render_signature(self):
+        return super(LinkCol, self)._render_signature() + (
+            self.endpoint,
+            tuple(self._url_kwargs.items()),
+            tuple(self._url_kwargs_extra.items()),
+            tuple(self.anchor_attrs.items()))
+
+    def _compile_item_tds(self, attr):
+        """If the url and the contents are done in the usual way, then
+        for each chunk of rows, build the urls from a template of the
+        endpoint's rule, rather than calling url_for for each item.
+
+        """
+        if self._overrides_any('td', 'td_contents', 'url', 'url_kwargs'):
+            return super(LinkCol, self)._compile_item_tds(attr)
+
+        from .urls import compile_url_for
+        attr_list = self.get_attr_list(attr)
+        template = self._td_template()
+        url_kwargs = self._compile_url_kwargs()
+        td_contents = self._compile_td_contents(attr_list)
+
+        def tds(items):
+            if not items:
+                return []
+            url = compile_url_for(self.endpoint, url_kwargs, items[0])
+            urls = escape_many([url(item) for item in items])
+            return [template.format(td_contents(item, url))
+                    for item, url in zip(items, urls)]
+
+        return tds
+
+    def _compile_exports(self, attr):
+        """Export the link's text, rather than the whole link, unless the
+        contents are done differently.
+
+        """
+        if self._overrides_any('td', 'td_contents'):
+            return super(LinkCol, self)._compile_exports(attr)
+
+        attr_list = self.get_attr_list(attr)
+        text = self.text
+        export_format_many = self.export_format_many
+        return lambda items: export_format_many(
+            [text(item, attr_list) for item in items])
+
+    def _compile_td_contents(self, attr_list):
+        """Return a function that takes an item and its (escaped) url
+        and returns the same as self._td_contents, but with the <a>
+        tag's other attributes formatted in advance.
+
+        """
+        if 'href' in self.anchor_attrs:
+            return lambda item, url: self._td_contents(
+                item, attr_list, Markup(url))
+
+        template = '<a{attrs}>{{}}</a>'.format(
+            attrs=_attrs_template(self.anchor_attrs, 'href'))
+        text = self.text
+        td_format = self.td_format
+        return lambda item, url: template.format(
+            url, td_format(text(item, attr_list)))
+
 
 class ButtonCol(LinkCol):
     """Just the same a LinkCol, but creates an empty form which gets
@@ -313,6 +960,8 @@ class ButtonCol(LinkCol):
 
     """
 
+    __slots__ = ('button_attrs', 'form_attrs', 'form_hidden_fields')
+
     def __init__(self, name, endpoint, attr=None, attr_list=None,
                  url_kwargs=None, button_attrs=None, form_attrs=None,
                  form_hidden_fields=None, **kwargs):
@@ -326,7 +975,7 @@ class ButtonCol(LinkCol):
         self.form_attrs = form_attrs or {}
         self.form_hidden_fields = form_hidden_fields or {}
 
-    def td_contents(self, item, attr_list):
+    def _td_contents(self, item, attr_list, url):
         button_attrs = dict(self.button_attrs)
         button_attrs['type'] = 'submit'
         button = element(
@@ -337,7 +986,7 @@ class ButtonCol(LinkCol):
         form_attrs = dict(self.form_attrs)
         form_attrs.update(dict(
             method='post',
-            action=self.url(item),
+            action=url,
         ))
         form_hidden_fields_elements = [
             element(
@@ -357,6 +1006,39 @@ class ButtonCol(LinkCol):
             escape_content=False,
         )
 
+    def _render_signature(self):
+        return super(ButtonCol, self)._render_signature() + (
+            tuple(self.button_attrs.items()),
+            tuple(self.form_attrs.items()),
+            tuple(self.form_hidden_fields.items()))
+
+    def _compile_td_contents(self, attr_list):
+        form_attrs = dict(self.form_attrs)
+        form_attrs['method'] = 'post'
+        if 'action' in form_attrs:
+            return lambda item, url: self._td_contents(
+                item, attr_list, Markup(url))
+
+        button_attrs = dict(self.button_attrs)
+        button_attrs['type'] = 'submit'
+        form_hidden_fields = ''.join(
+            element(
+                'input',
+                attrs=dict(
+                    type='hidden',
+                    name=name,
+                    value=value))
+            for name, value in sorted(self.form_hidden_fields.items()))
+        template = (
+            '<form{form_attrs}>{hidden}'
+            '<button{button_attrs}>{{}}</button></form>').format(
+                form_attrs=_attrs_template(form_attrs, 'action'),
+                hidden=_escape_braces(form_hidden_fields),
+                button_attrs=_escape_braces(_format_attrs(button_attrs)))
+        text = self.text
+        return lambda item, url: template.format(
+            url, Markup.escape(text(item, attr_list)))
+
 
 class NestedTableCol(Col):
     """This column type allows for nesting tables into a column.  The
@@ -377,6 +1059,8 @@ class NestedTableCol(Col):
 
     """
 
+    __slots__ = ('table_class',)
+
     def __init__(self, name, table_class, **kwargs):
         super(NestedTableCol, self).__init__(name, **kwargs)
         self.table_class = table_class
@@ -384,3 +1068,11 @@ class NestedTableCol(Col):
     def td_format(self, content):
         t = self.table_class(content).__html__()
         return t
+
+    def export_format(self, content):
+        """Export the nested table as a list of its rows, each a dict of
+        what its columns export.
+
+        """
+        return [row for rows in self.table_class(content)._iter_export_dicts()
+                for row in rows]
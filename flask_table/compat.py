@@ -1,2 +1,36 @@
 def with_metaclass(meta, base=object):
     return meta("NewBase", (base,), {})
+
+
+def overrides(obj, base, name):
+    """Whether the class of obj (or obj itself, if it is a class)
+    replaces the attribute name that it would otherwise inherit from
+    base.
+
+    Compares with != rather than `is` so that this also works with
+    Python 2's unbound methods, which are created afresh on each
+    access.
+
+    """
+    cls = obj if isinstance(obj, type) else type(obj)
+    return getattr(cls, name, None) != getattr(base, name, None)
+
+
+try:
+    from itertools import izip as zip
+except ImportError:
+    zip = zip
+
+
+try:
+    text_type = unicode
+    integer_types = (int, long)
+except NameError:
+    text_type = str
+    integer_types = (int,)
+
+
+try:
+    import copyreg
+except ImportError:
+    import copy_reg as copyreg
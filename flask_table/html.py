@@ -1,19 +1,45 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+from decimal import Decimal
 from functools import partial
 
-from flask import Markup
+from markupsafe import Markup
+
+from .compat import integer_types, text_type
+
+# Types whose str() never needs escaping.
+_NO_ESCAPE_TYPES = frozenset((bool, float, Decimal) + integer_types)
 
 
 def element(element, attrs=None, content='',
-            escape_attrs=True, escape_content=True):
+            escape_attrs=True, escape_content=True, formatted_attrs=None):
+    """Return the html for an element. If the attributes have
+    already been formatted with _format_attrs, they can be passed as
+    formatted_attrs instead of attrs to save formatting them again.
+
+    """
+    if formatted_attrs is None:
+        formatted_attrs = _format_attrs(attrs or {}, escape_attrs)
     return '<{element}{formatted_attrs}>{content}</{element}>'.format(
         element=element,
-        formatted_attrs=_format_attrs(attrs or {}, escape_attrs),
+        formatted_attrs=formatted_attrs,
         content=_format_content(content, escape_content),
     )
 
 
+def open_tag(element, attrs=None, escape_attrs=True, formatted_attrs=None):
+    if formatted_attrs is None:
+        formatted_attrs = _format_attrs(attrs or {}, escape_attrs)
+    return '<{element}{formatted_attrs}>'.format(
+        element=element,
+        formatted_attrs=formatted_attrs,
+    )
+
+
+def close_tag(element):
+    return '</{element}>'.format(element=element)
+
+
 def _format_attrs(attrs, escape_attrs=True):
     out = []
     for name, value in sorted(attrs.items()):
@@ -24,9 +50,56 @@ def _format_attrs(attrs, escape_attrs=True):
     return ''.join(out)
 
 
+def _attrs_template(attrs, name):
+    """Format attrs as _format_attrs does, but with the name attribute
+    added and its value left as {} to be filled in with str.format (so
+    any other braces are escaped). The value that fills it in needs to
+    be escaped already.
+
+    """
+    before = dict((k, v) for k, v in attrs.items() if k < name)
+    after = dict((k, v) for k, v in attrs.items() if k > name)
+    return '{before} {name}="{{}}"{after}'.format(
+        before=_escape_braces(_format_attrs(before)),
+        name=Markup.escape(name),
+        after=_escape_braces(_format_attrs(after)))
+
+
+def _escape_braces(s):
+    return s.replace('{', '{{').replace('}', '}}')
+
+
 def _format_content(content, escape_content=True):
     if isinstance(content, (list, tuple)):
         content = ''.join(content)
     if escape_content:
         return Markup.escape(content)
     return content
+
+
+def escape_many(values):
+    """Return a list of the values escaped just as Markup.escape would,
+    but as plain strings. Numbers are just converted to strings, and
+    plain strings are only escaped if they contain something that
+    needs escaping, which saves creating a Markup for each value.
+
+    """
+    out = []
+    append = out.append
+    for value in values:
+        cls = type(value)
+        if cls is text_type:
+            if ('&' in value or '<' in value or '>' in value or
+                    '"' in value or "'" in value):
+                value = (value
+                         .replace('&', '&amp;')
+                         .replace('<', '&lt;')
+                         .replace('>', '&gt;')
+                         .replace('"', '&#34;')
+                         .replace("'", '&#39;'))
+            append(value)
+        elif cls in _NO_ESCAPE_TYPES:
+            append(text_type(value))
+        else:
+            append(Markup.escape(value))
+    return out
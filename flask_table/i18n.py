@@ -0,0 +1,158 @@
+"""Locales and translations. Babel and Flask-Babel are only imported
+when they are first needed, so that importing flask_table stays quick
+for programs that never render dates or translated strings.
+
+"""
+from .compat import text_type
+
+# The locale to use when there is no request to get one from. This is
+# set in the processes that render rows in parallel, to the locale of
+# the request that the table is being rendered for.
+_process_locale = None
+
+# The strings of all of the LazyStrings. In the processes that render
+# rows in parallel, there is no request for gettext to translate them
+# for, so their translations are sent along with the locale.
+_lazy_strings = set()
+_process_translations = {}
+
+
+def get_locale():
+    """Return the current locale from Flask-Babel, or None if there
+    isn't one, eg because we're outside of a request or Babel hasn't
+    been set up for the app.
+
+    """
+    from flask_babel import get_locale as _flask_babel_get_locale
+    try:
+        locale = _flask_babel_get_locale()
+    except KeyError:
+        locale = None
+    if locale is None:
+        return _process_locale
+    return locale
+
+
+def get_time_locale():
+    """Return the locale to format dates and times with. That is the
+    current Flask-Babel locale if there is one, and otherwise Babel's
+    default, which comes from the environment variables.
+
+    """
+    locale = get_locale()
+    if locale is None:
+        import babel.dates
+        return babel.dates.LC_TIME
+    return locale
+
+
+def gettext(string):
+    """Translate string with Flask-Babel, or return it as it is if
+    Babel hasn't been set up for the app.
+
+    """
+    from flask_babel import gettext as _flask_babel_gettext
+    try:
+        return _flask_babel_gettext(string)
+    except KeyError:
+        return string
+
+
+def _translate_lazy(string):
+    translation = _process_translations.get(string)
+    if translation is not None:
+        return translation
+    return gettext(string)
+
+
+def lazy_translations():
+    """Return the translations of all of the LazyStrings for the current
+    locale, to send to the processes that render rows in parallel.
+
+    """
+    return dict((string, gettext(string)) for string in _lazy_strings)
+
+
+class LazyString(object):
+    """A string that is only translated, with gettext, when it is used.
+    This is for the strings that are set when flask_table is imported,
+    such as Table.no_items, so that they are translated into the
+    locale of the request that they are rendered for.
+
+    It isn't escaped, or treated as safe html, any differently to the
+    translated string.
+
+    """
+
+    def __init__(self, string):
+        self.string = string
+        _lazy_strings.add(string)
+
+    def __str__(self):
+        return str(_translate_lazy(self.string))
+
+    def __unicode__(self):
+        return text_type(_translate_lazy(self.string))
+
+    def __format__(self, format_spec):
+        return format(_translate_lazy(self.string), format_spec)
+
+    def __repr__(self):
+        return 'l' + repr(_translate_lazy(self.string))
+
+    def __len__(self):
+        return len(_translate_lazy(self.string))
+
+    def __contains__(self, item):
+        return item in _translate_lazy(self.string)
+
+    def __add__(self, other):
+        return _translate_lazy(self.string) + other
+
+    def __radd__(self, other):
+        return other + _translate_lazy(self.string)
+
+    def __mod__(self, other):
+        return _translate_lazy(self.string) % other
+
+    def __eq__(self, other):
+        return _translate_lazy(self.string) == other
+
+    def __ne__(self, other):
+        return _translate_lazy(self.string) != other
+
+    def __lt__(self, other):
+        return _translate_lazy(self.string) < other
+
+    def __hash__(self):
+        return hash(_translate_lazy(self.string))
+
+    def __getattr__(self, name):
+        if name == 'string':
+            raise AttributeError(name)
+        return getattr(_translate_lazy(self.string), name)
+
+
+def lazy_gettext(string):
+    """Return string as a LazyString, to be translated when used."""
+    return LazyString(string)
+
+
+def translate(value):
+    """Return value translated, if it is a LazyString, or else as it
+    is.
+
+    """
+    if isinstance(value, LazyString):
+        return _translate_lazy(value.string)
+    return value
+
+
+def translate_values(mapping):
+    """Return mapping with any LazyString values translated, or mapping
+    itself if there aren't any.
+
+    """
+    if not any(isinstance(v, LazyString) for v in mapping.values()):
+        return mapping
+    return dict((k, translate(v)) for k, v in mapping.items())
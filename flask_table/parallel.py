@@ -0,0 +1,174 @@
+"""Rendering chunks of rows in other processes, for tables with
+processes set, and the cells of concurrent columns in threads. These
+need concurrent.futures (and Python 3.7 or later for processes, for
+the executor's initializer).
+
+"""
+import copy
+import pickle
+import time
+from collections import deque
+from itertools import chain
+
+from . import i18n
+from .table import _RowRenderer
+
+# The table that rows are rendered for, in a worker process.
+_worker_table = None
+
+
+def iter_render(table, chunks, render):
+    """Generate render(chunk) for each of chunks, in order, but with the
+    rendering done by table.processes worker processes.
+
+    The table (without its items) is sent to each worker once, when it
+    starts, along with the current locale and the translations of the
+    lazily translated strings, such as BoolCol's. Then each chunk is sent to
+    whichever worker is free. If the table can't be pickled, or there
+    is only one chunk, then the rows are rendered here. And if a chunk
+    can't be pickled or fails to render in a worker, eg because a
+    column needs the request context, then that chunk is rendered
+    here instead, so any error comes from rendering it as usual.
+
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return
+    second = next(chunks, None)
+    if second is None:
+        yield render(first)
+        return
+    chunks = chain([first, second], chunks)
+
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+        worker_table = copy.copy(table)
+        worker_table.items = None
+        worker_table._page_items = None
+        table_data = pickle.dumps(worker_table, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        for chunk in chunks:
+            yield render(chunk)
+        return
+
+    locale = i18n.get_locale()
+    locale = str(locale) if locale is not None else None
+    translations = i18n.lazy_translations()
+    processes = table.processes
+    executor = ProcessPoolExecutor(
+        processes, initializer=_init_worker,
+        initargs=(table_data, locale, translations))
+    with executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, _submit(executor, chunk)))
+            # Keep each of the workers busy, but don't read ahead any
+            # further than that.
+            while len(pending) > 2 * processes:
+                yield _result(render, *pending.popleft())
+        while pending:
+            yield _result(render, *pending.popleft())
+
+
+def _submit(executor, chunk):
+    if not chunk:
+        return None
+    try:
+        data = pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+    return executor.submit(_render_chunk, data)
+
+
+def _result(render, chunk, future):
+    if future is not None:
+        try:
+            return future.result()
+        except Exception:
+            pass
+    return render(chunk)
+
+
+def _init_worker(table_data, locale, translations):
+    global _worker_table
+    _worker_table = pickle.loads(table_data)
+    i18n._process_translations = translations
+    if locale is not None:
+        from babel import Locale
+        i18n._process_locale = Locale.parse(locale)
+
+
+def _render_chunk(data):
+    chunk = pickle.loads(data)
+    renderer = _worker_table._get_row_renderer()
+    if isinstance(renderer, _RowRenderer):
+        return renderer.render(chunk)
+    return [renderer(item) for item in chunk]
+
+
+class CellPool(object):
+    """A pool of threads to render the cells of concurrent columns in,
+    for one render of a table. All of the cells need to have been
+    rendered within timeout seconds (if it isn't None) of the pool
+    being created, or a TimeoutError is raised. If rendering a cell
+    raises an error, then that gets raised from results, and the rest
+    of the cells are cancelled.
+
+    Each cell is rendered in a copy of the current context, so the
+    Flask request and app contexts are available.
+
+    """
+
+    def __init__(self, max_workers, timeout=None):
+        from concurrent.futures import ThreadPoolExecutor
+        self.executor = ThreadPoolExecutor(max_workers)
+        self.deadline = None if timeout is None else time.time() + timeout
+        self.pending = set()
+
+    def map(self, fn, items):
+        """Start fn(item) for each of items, and return their futures."""
+        futures = [self.executor.submit(_context_runner(), fn, item)
+                   for item in items]
+        self.pending.update(futures)
+        return futures
+
+    def results(self, futures):
+        """Wait for the results of futures from map, in order."""
+        out = []
+        for future in futures:
+            timeout = None
+            if self.deadline is not None:
+                timeout = max(0, self.deadline - time.time())
+            try:
+                out.append(future.result(timeout))
+            except BaseException:
+                self.cancel()
+                raise
+            self.pending.discard(future)
+        return out
+
+    def cancel(self):
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False)
+
+
+def _context_runner():
+    """Return a function that calls a function in a copy of the current
+    context, to run in another thread.
+
+    """
+    try:
+        from contextvars import copy_context
+    except ImportError:
+        return _call
+    return copy_context().run
+
+
+def _call(fn, *args):
+    return fn(*args)
@@ -0,0 +1,239 @@
+"""Tables of the results of SQLAlchemy queries, that get the database to
+do the sorting and pagination, and load just what the columns need.
+
+This needs SQLAlchemy to be installed, so isn't imported by
+flask_table itself. Use it with:
+
+from flask_table.sqla import QueryTable
+
+"""
+from sqlalchemy import case, func, inspect, select
+from sqlalchemy.orm import ColumnProperty, Query, RelationshipProperty
+from sqlalchemy.orm import joinedload, load_only
+from sqlalchemy.sql import Select
+
+from .columns import Col
+from .compat import overrides
+from .table import Table, _sliced, _sorted
+
+
+class QueryTable(Table):
+    """A table that can be given a SQLAlchemy Query, or a Select along
+    with the session to run it in, instead of a list of items.
+
+    Before the query is run:
+
+    - sorting by sort_by, when sort_items is set, becomes an ORDER BY,
+      as long as each column being sorted by shows a column of the
+      queried entity and has no sort_key. Otherwise, the items are
+      sorted in Python as usual.
+
+    - the page, or the limit, becomes a LIMIT and OFFSET.
+
+    - the visible columns' attr_lists become loader options: columns
+      of the entity are loaded with load_only, and dotted paths
+      through relationships, eg 'a.b.c', are loaded with joinedload
+      (and load_only at the far end), so that there is no lazy load
+      for each row. If any column can't say what it reads (see
+      Col.get_attr_lists), or tr or get_tr_attrs have been
+      overridden, then all columns are loaded, but relationships are
+      still eagerly loaded.
+
+    If the query isn't for a single mapped entity, only the sorting and
+    pagination are pushed down.
+
+    """
+
+    # The session to run a Select in. Not needed for a Query.
+    session = None
+
+    def __init__(self, items, session=None, **kwargs):
+        super(QueryTable, self).__init__(items, **kwargs)
+        if session is not None:
+            self.session = session
+
+    def get_items(self):
+        query = self.items
+        if not isinstance(query, (Query, Select)):
+            return super(QueryTable, self).get_items()
+
+        entity = _query_entity(query)
+        options = self.get_load_options(entity) if entity else []
+        if options:
+            query = query.options(*options)
+
+        start, stop = self._get_item_range()
+        sort_key = self.get_sort_key() if self.sort_items else None
+        if sort_key is not None:
+            order_by = self.get_order_by(entity) if entity else None
+            if order_by is None:
+                items = _sorted(
+                    self._execute(query, options), sort_key,
+                    self.sort_reverse, stop)
+                if start:
+                    items = _sliced(items, start, None)
+                return items
+            existing = getattr(query, '_order_by_clauses', ())
+            if not existing:
+                # Break ties in the same way each time.
+                existing = _primary_key_attrs(entity)
+            query = query.order_by(None).order_by(
+                *(list(order_by) + list(existing)))
+
+        if start or stop is not None:
+            query = _sliced(query, start, stop)
+        return self._execute(query, options)
+
+    def get_item_count(self):
+        query = self.items
+        if isinstance(query, Select):
+            count = select(func.count()).select_from(
+                query.order_by(None).subquery())
+            return self._get_session().scalar(count)
+        return super(QueryTable, self).get_item_count()
+
+    def get_order_by(self, entity):
+        """Return the ORDER BY clauses to sort by sort_by and
+        sort_reverse in the same way that get_sort_key would, or None
+        if that can't be done in the database.
+
+        """
+        sort_by = self.sort_by
+        if not isinstance(sort_by, (list, tuple)):
+            sort_by = [sort_by]
+
+        order_by = []
+        for col_key in sort_by:
+            col = self._cols.get(col_key)
+            if col is None or not col.allow_sort:
+                continue
+            if col.sort_key is not None or overrides(
+                    col, Col, '_compile_sort_key'):
+                return None
+            attr_list = col.get_attr_list(col_key)
+            if not attr_list:
+                # The Python sort skips it too.
+                continue
+            attr = _column_attr(entity, attr_list)
+            if attr is None:
+                return None
+            # Put NULLs after everything else (so first when sorting in
+            # reverse), as the Python sort does.
+            clauses = [attr]
+            if getattr(attr.property.columns[0], 'nullable', True):
+                clauses.insert(0, case((attr.is_(None), 1), else_=0))
+            if self.sort_reverse:
+                clauses = [clause.desc() for clause in clauses]
+            order_by.extend(clauses)
+        return order_by
+
+    def get_load_options(self, entity):
+        """Return the loader options for the visible columns, for a
+        query of entity.
+
+        """
+        cls = type(self)
+        load_columns = not (overrides(cls, Table, 'tr') or overrides(
+            cls, Table, 'get_tr_attrs'))
+        root = _LoadNode(inspect(entity).mapper)
+        for attr, col in self._cols.items():
+            if not col.show:
+                continue
+            attr_lists = col.get_attr_lists(attr)
+            if attr_lists is None:
+                load_columns = False
+                continue
+            for attr_list in attr_lists:
+                root.add(attr_list)
+        return root.options(entity, load_columns)
+
+    def _get_session(self):
+        if self.session is None:
+            raise ValueError('session needs to be set to run a Select')
+        return self.session
+
+    def _execute(self, query, options):
+        if isinstance(query, Query):
+            return query
+        session = self._get_session()
+        if _query_entity(query) is None:
+            return session.execute(query)
+        result = session.scalars(query)
+        if options:
+            # Joined eager loads of collections repeat the rows.
+            result = result.unique()
+        return result
+
+
+class _LoadNode(object):
+    """What to load for a mapped entity: which of its columns, and which
+    relationships to load along with it. If full is set, then
+    something reads more than we know of, so all of its columns are
+    loaded.
+
+    """
+
+    def __init__(self, mapper):
+        self.mapper = mapper
+        self.columns = set()
+        self.relationships = {}
+        self.full = False
+
+    def add(self, attr_list):
+        prop = self.mapper.attrs.get(attr_list[0])
+        if isinstance(prop, ColumnProperty):
+            self.columns.add(prop.key)
+        elif isinstance(prop, RelationshipProperty):
+            child = self.relationships.get(prop.key)
+            if child is None:
+                child = self.relationships[prop.key] = _LoadNode(prop.mapper)
+            if len(attr_list) > 1:
+                child.add(attr_list[1:])
+            else:
+                # The related object is used as a whole.
+                child.full = True
+        else:
+            # Eg a Python property, that could read anything.
+            self.full = True
+
+    def options(self, entity, load_columns):
+        options = []
+        if load_columns and not self.full and self.columns:
+            options.append(load_only(
+                *[getattr(entity, key) for key in sorted(self.columns)]))
+        for key, child in sorted(self.relationships.items()):
+            option = joinedload(getattr(entity, key))
+            child_options = child.options(child.mapper.class_, load_columns)
+            if child_options:
+                option = option.options(*child_options)
+            options.append(option)
+        return options
+
+
+def _query_entity(query):
+    """Return the mapped entity that query is for, or None if it isn't
+    just for one.
+
+    """
+    descriptions = query.column_descriptions
+    if len(descriptions) != 1:
+        return None
+    entity = descriptions[0]['entity']
+    if entity is None or descriptions[0]['expr'] is not entity:
+        return None
+    return entity
+
+
+def _column_attr(entity, attr_list):
+    if not attr_list or len(attr_list) != 1:
+        return None
+    prop = inspect(entity).mapper.attrs.get(attr_list[0])
+    if not isinstance(prop, ColumnProperty) or len(prop.columns) != 1:
+        return None
+    return getattr(entity, prop.key)
+
+
+def _primary_key_attrs(entity):
+    mapper = inspect(entity).mapper
+    return [getattr(entity, mapper.get_property_by_column(column).key)
+            for column in mapper.primary_key]
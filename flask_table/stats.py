@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+
+class PhaseStats(object):
+    """The total time spent in one phase of rendering a column's cells,
+    and how many cells that was for.
+
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __repr__(self):
+        return 'PhaseStats(seconds={:.6f}, calls={})'.format(
+            self.seconds, self.calls)
+
+
+class RenderStats(object):
+    """Timings for one render of a table, when the table's instrument
+    option is set.
+
+    rows, bytes and seconds are the totals for the render: how many
+    rows were rendered, how long the html was in utf-8, and how long
+    rendering it took. columns maps each column's key to a dict of the
+    PhaseStats for each phase of rendering its cells:
+
+    - 'access': getting the values from the items (the attr_list).
+    - 'format': td_format (or td_format_many).
+    - 'escape': escaping the values, for columns that just show their
+      values. For other columns, any escaping is part of 'format'.
+    - 'element': putting the contents into the <td>s.
+    - 'td': all of the above together, for columns that need the
+      whole item to render a cell, eg because they override
+      td_contents, or are LinkCols.
+
+    """
+
+    PHASES = ('access', 'format', 'escape', 'element', 'td')
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.columns = OrderedDict()
+
+    def add(self, col_key, phase, seconds, calls):
+        phases = self.columns.get(col_key)
+        if phases is None:
+            phases = self.columns[col_key] = OrderedDict()
+        phase_stats = phases.get(phase)
+        if phase_stats is None:
+            phase_stats = phases[phase] = PhaseStats()
+        phase_stats.seconds += seconds
+        phase_stats.calls += calls
+
+    def as_dict(self):
+        """Return the stats as plain dicts, lists and numbers, eg to
+        output as JSON.
+
+        """
+        return dict(
+            rows=self.rows,
+            bytes=self.bytes,
+            seconds=self.seconds,
+            columns=OrderedDict(
+                (col_key, OrderedDict(
+                    (phase, dict(seconds=s.seconds, calls=s.calls))
+                    for phase, s in phases.items()))
+                for col_key, phases in self.columns.items()),
+        )
+
+    def __repr__(self):
+        return 'RenderStats(rows={}, bytes={}, seconds={:.6f})'.format(
+            self.rows, self.bytes, self.seconds)
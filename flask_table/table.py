@@ -1,13 +1,24 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
-from collections import OrderedDict
+import csv
+import io
+import json
+import sys
+from collections import OrderedDict, deque
+from hashlib import sha1
+from heapq import nlargest, nsmallest
+from itertools import islice
+from timeit import default_timer
 
-from flask import Markup
-from flask_babel import gettext as _
+from markupsafe import Markup
 
+from .cache import LRUCache
+from .columnar import ColumnarItems, iter_rows
 from .columns import Col
-from .compat import with_metaclass
-from .html import element
+from .compat import copyreg, overrides, text_type, with_metaclass, zip
+from .html import element, escape_many, open_tag, close_tag
+from .i18n import get_locale, gettext, lazy_gettext
+from .stats import RenderStats
 
 
 class TableMeta(type):
@@ -41,6 +52,229 @@ class TableMeta(type):
         return cls
 
 
+# Attributes that tables keep on their classes, but that are worked out
+# again as needed, so aren't pickled.
+_CLASS_CACHES = frozenset([
+    '_cols', '_row_renderer', '_thead_cache', '_row_cache', '_html_cache',
+    '_row_cache_prefixes', '__dict__', '__weakref__'])
+
+
+def _reduce_table_class(cls):
+    """Pickle a table class. Those that can be imported by name are
+    pickled by name, as classes usually are. Others, such as those
+    made by create_table, are pickled as their name, bases, attributes
+    and columns, and rebuilt from these when unpickled.
+
+    """
+    qualname = getattr(cls, '__qualname__', cls.__name__)
+    obj = sys.modules.get(cls.__module__)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name, None)
+    if obj is cls:
+        return qualname
+
+    attrs = dict((k, v) for k, v in cls.__dict__.items()
+                 if k not in _CLASS_CACHES)
+    return _rebuild_table_class, (
+        cls.__name__, cls.__bases__, attrs, list(cls._cols.items()))
+
+
+def _rebuild_table_class(name, bases, attrs, cols):
+    cls = TableMeta(str(name), bases, attrs)
+    cls._cols = OrderedDict(cols)
+    return cls
+
+
+copyreg.pickle(TableMeta, _reduce_table_class)
+
+
+class _RowRenderer(object):
+    """Renders items as <tr>s in the same way as Table.tr, but with the
+    visible columns and the rendering of each of their cells worked
+    out up front. One of these is built and cached for each Table
+    class the first time that it is rendered.
+
+    Items are rendered a chunk at a time, a column at a time, so that
+    columns whose contents only depend on their value can format the
+    whole chunk's values together.
+
+    """
+
+    def __init__(self, cols):
+        self.cols = cols
+        self.td_attrs = tuple(c.formatted_td_html_attrs for _, c in cols)
+        self.signatures = tuple(c._render_signature() for _, c in cols)
+        # For each column, either (attr_list, from_attr_list, tds) if it
+        # can render a list of values, or (None, item_tds, None) if its
+        # tds need the whole items.
+        self.cells = []
+        # And for columnar items, how to get the value from the column.
+        self.from_values = []
+        # The index and td function of each concurrent column, whose
+        # cells can be rendered in a CellPool.
+        self.concurrent = []
+        # And for timing the rendering, the template, td_format_many
+        # and escape_many (or None) that make up each column's tds.
+        self.parts = []
+        for attr, col in cols:
+            compiled = col._compile_tds(attr)
+            if col.concurrent:
+                td = col._compile_td(attr)
+                self.concurrent.append((len(self.cells), td))
+                self.cells.append(
+                    (None, lambda items, td=td: [td(i) for i in items], None))
+                self.from_values.append(None)
+                self.parts.append(None)
+            elif compiled is None:
+                self.cells.append((None, col._compile_item_tds(attr), None))
+                self.from_values.append(None)
+                self.parts.append(None)
+            else:
+                self.cells.append(compiled)
+                attr_list = compiled[0]
+                self.from_values.append(
+                    col._compile_from_attr_list(attr_list[1:]))
+                self.parts.append(_tds_parts(col))
+        self.template = '{opening}{{}}{closing}'.format(
+            opening=open_tag('tr'), closing=close_tag('tr'))
+        # For writing the rows, each after a newline.
+        self.tr_open = '\n' + open_tag('tr')
+        self.tr_close = close_tag('tr')
+
+    def render(self, items, pool=None):
+        """Render a list of items as a list of <tr>s. If there is a
+        CellPool, then the cells of concurrent columns are rendered in
+        it, while the rest are rendered here.
+
+        """
+        pending = {}
+        if pool is not None:
+            for i, td in self.concurrent:
+                pending[i] = pool.map(td, items)
+
+        columns = []
+        for i, (_, get, tds) in enumerate(self.cells):
+            if i in pending:
+                columns.append(None)
+            elif tds is None:
+                columns.append(get(items))
+            else:
+                columns.append(tds([get(item) for item in items]))
+        for i, futures in pending.items():
+            columns[i] = pool.results(futures)
+        return self._trs(columns, len(items))
+
+    def render_timed(self, items, stats):
+        """Render a list of items as a list of <tr>s, as render does,
+        but a phase at a time, adding how long each took to stats.
+
+        """
+        num_rows = len(items)
+        columns = []
+        for (attr, _), (_, get, tds), parts in zip(
+                self.cols, self.cells, self.parts):
+            start = default_timer()
+            if tds is None:
+                columns.append(get(items))
+                stats.add(attr, 'td', default_timer() - start, num_rows)
+                continue
+
+            values = [get(item) for item in items]
+            end = default_timer()
+            stats.add(attr, 'access', end - start, num_rows)
+            template, td_format_many, escape = parts
+            start = end
+            if td_format_many is not None:
+                values = td_format_many(values)
+                end = default_timer()
+                stats.add(attr, 'format', end - start, num_rows)
+            else:
+                values = escape(values)
+                end = default_timer()
+                stats.add(attr, 'escape', end - start, num_rows)
+            start = end
+            columns.append([template.format(value) for value in values])
+            stats.add(attr, 'element', default_timer() - start, num_rows)
+        return self._trs(columns, num_rows)
+
+    def write(self, items, write):
+        """Render a list of items as render does, but rather than
+        returning the <tr>s, write them with write, each after a
+        newline. They are written in one piece, joined straight from
+        the <td>s, rather than joining each row's <td>s into a <tr>
+        and then joining the <tr>s.
+
+        """
+        columns = [get(items) if tds is None else
+                   tds([get(item) for item in items])
+                   for _, get, tds in self.cells]
+        write(self._joined_trs(columns, len(items)))
+
+    def write_columns(self, chunk, write):
+        """As write, but for a chunk from ColumnarItems.iter_chunks."""
+        write(self._joined_trs(*self._columnar_tds(chunk)))
+
+    def render_columns(self, chunk):
+        """Render a chunk from ColumnarItems.iter_chunks as a list of
+        <tr>s.
+
+        """
+        return self._trs(*self._columnar_tds(chunk))
+
+    def _columnar_tds(self, chunk):
+        """Return the <td>s of each column for a chunk from
+        ColumnarItems.iter_chunks, and the number of rows.
+
+        """
+        rows = None
+        columns = []
+        for (attr_list, get, tds), from_value in zip(
+                self.cells, self.from_values):
+            if tds is None:
+                if rows is None:
+                    rows = list(iter_rows(chunk))
+                columns.append(get(rows))
+            else:
+                columns.append(tds(
+                    [from_value(value) for value in chunk[attr_list[0]]]))
+        num_rows = len(next(iter(chunk.values()))) if chunk else 0
+        return columns, num_rows
+
+    def _trs(self, columns, num_rows):
+        if not columns:
+            return [self.template.format('')] * num_rows
+        return [self.template.format(''.join(tds)) for tds in zip(*columns)]
+
+    def _joined_trs(self, columns, num_rows):
+        tr_open = self.tr_open
+        tr_close = self.tr_close
+        if not columns:
+            return (tr_open + tr_close) * num_rows
+        parts = []
+        append = parts.append
+        extend = parts.extend
+        for tds in zip(*columns):
+            append(tr_open)
+            extend(tds)
+            append(tr_close)
+        return ''.join(parts)
+
+
+def _tds_parts(col):
+    """Return the template, td_format_many and escape_many that make up
+    the tds from col._compile_tds. Columns that just show their values
+    only need escaping, so td_format_many is None for those.
+    Otherwise escape_many is None, as any escaping is part of
+    td_format_many.
+
+    """
+    template = col._td_template()
+    if col.escape and not (overrides(col, Col, 'td_format') or overrides(
+            col, Col, 'td_format_many')):
+        return template, None, escape_many
+    return template, col.td_format_many, None
+
+
 class Table(with_metaclass(TableMeta)):
     """The main table class that should be subclassed when to create a
     table. Initialise with an iterable of objects. Then either use the
@@ -60,15 +294,79 @@ class Table(with_metaclass(TableMeta)):
     thead_attrs = None
     thead_classes = []
     allow_sort = False
-    no_items = _('No Items')
+    # Whether the table should sort the items itself, by sort_by.
+    sort_items = False
+    # The most items to render, or None for all of them.
+    limit = None
+    # For splitting the items into pages of per_page items, and
+    # showing the page'th of them (counting from 1). Pagination is off
+    # if per_page is None.
+    page = 1
+    per_page = None
+    pager_classes = ['pagination']
+    # How many pages either side of the current page to link to in the
+    # pager, as well as the first and last pages.
+    pager_window = 2
+    no_items = lazy_gettext('No Items')
     allow_empty = False
+    # How many rows iter_html renders before yielding them.
+    chunk_rows = 500
+    # How many processes to render the chunks of rows in, or None to
+    # render them in this one.
+    processes = None
+    # How many threads to render the cells of columns with
+    # concurrent=True in, and how many seconds they have to render all
+    # of them, or None for no limit.
+    concurrent_workers = 8
+    concurrent_timeout = None
+    # Whether to time rendering, for each column and each phase of
+    # rendering its cells. The RenderStats for the last render are kept
+    # as stats, and passed to report_stats (and so to stats_callback,
+    # if it is set). Rows are all rendered in this thread when timing.
+    instrument = False
+    stats_callback = None
+    stats = None
+    # The RenderStats for the render in progress.
+    _stats = None
+    # How many rendered <thead>s to cache for this table class, keyed
+    # by thead_cache_key. Caching is off if this is 0.
+    thead_cache_size = 0
+    # How many rendered <tr>s to cache for this table class, keyed by
+    # row_cache_key. Caching is off if this is 0, unless row_cache is
+    # set to a cache to use instead, with the same interface as
+    # LRUCache.
+    row_cache_size = 0
+    row_cache = None
+    # How many rendered tables make_response caches for this table
+    # class, keyed by their ETag. Or html_cache can be set to another
+    # cache to use instead.
+    html_cache_size = 0
+    html_cache = None
+    # The items that have already been got, for make_response.
+    _page_items = None
 
     def __init__(self, items, classes=None, thead_classes=None,
                  sort_by=None, sort_reverse=False, no_items=None,
-                 table_id=None, border=None, html_attrs=None):
+                 table_id=None, border=None, html_attrs=None,
+                 sort_items=None, limit=None, page=None, per_page=None,
+                 processes=None, instrument=None, stats_callback=None):
         self.items = items
         self.sort_by = sort_by
         self.sort_reverse = sort_reverse
+        if sort_items is not None:
+            self.sort_items = sort_items
+        if limit is not None:
+            self.limit = limit
+        if page is not None:
+            self.page = page
+        if per_page is not None:
+            self.per_page = per_page
+        if processes is not None:
+            self.processes = processes
+        if instrument is not None:
+            self.instrument = instrument
+        if stats_callback is not None:
+            self.stats_callback = stats_callback
         if classes is not None:
             self.classes = classes
         if thead_classes is not None:
@@ -99,21 +397,533 @@ class Table(with_metaclass(TableMeta)):
         return attrs
 
     def __html__(self):
+        if not self.instrument:
+            return self._html()
+
+        self._stats = stats = RenderStats()
+        start = default_timer()
+        try:
+            html = self._html()
+        finally:
+            self._stats = None
+        stats.seconds = default_timer() - start
+        stats.bytes = len(html.encode('utf-8'))
+        self.stats = stats
+        self.report_stats(stats)
+        return html
+
+    def _html(self):
+        if not overrides(self, Table, 'tbody'):
+            out = []
+            self._write_html(out.append, self.chunk_rows)
+            return ''.join(out)
+
         tbody = self.tbody()
         if tbody or self.allow_empty:
             content = '\n{thead}\n{tbody}\n'.format(
                 thead=self.thead(),
                 tbody=tbody,
             )
-            return element(
+            html = element(
                 'table',
                 attrs=self.get_html_attrs(),
                 content=content,
                 escape_content=False)
         else:
-            return element('p', content=self.no_items)
+            html = element('p', content=self.no_items)
+        pager = self.pager()
+        if pager:
+            html = '{}\n{}'.format(html, pager)
+        return html
+
+    def iter_html(self, chunk_rows=None):
+        """Generate the same html as __html__, but in pieces: first the
+        opening <table> and the <thead>, then the rows in batches of
+        chunk_rows, then the closing tags. This means that the whole
+        table never needs to be held in memory, and the first piece
+        can be sent before all of the items have been rendered.
+
+        Eg, from within a view:
+
+        return Response(stream_with_context(table.iter_html()))
+
+        If __html__ or tbody have been overridden, then this falls
+        back to yielding the output of __html__ in one piece.
+
+        """
+        if self._html_overridden():
+            pieces = self._iter_whole_html()
+        else:
+            pieces = self._iter_html(chunk_rows)
+        if self.instrument:
+            pieces = self._iter_timed(pieces)
+        return pieces
+
+    def render_to(self, fp, chunk_rows=None):
+        """Write the same html as __html__ to fp, a piece at a time, as
+        it is rendered. fp can be anything with a write method that
+        takes strings, such as an io.StringIO, a file opened in text
+        mode, or socket.makefile('w'), or else a list, which the pieces
+        are appended to. This saves building up the whole table in
+        memory, or copying the rows into it, so is the quickest way to
+        render a large table, eg into a file for a report:
+
+        with io.open('report.html', 'w', encoding='utf-8') as f:
+            table.render_to(f)
+
+        The rows are written in batches of chunk_rows, as with
+        iter_html. If __html__ or tbody have been overridden, then
+        the output of __html__ is written in one piece.
+
+        """
+        write = getattr(fp, 'write', None)
+        if write is None:
+            write = fp.append
+        if self._html_overridden():
+            # __html__ reports its own stats, if it gets to Table's.
+            write(self.__html__())
+            return
+        if not self.instrument:
+            self._write_html(write, chunk_rows)
+            return
+
+        stats = RenderStats()
+
+        def write_counted(piece):
+            stats.bytes += len(piece.encode('utf-8'))
+            write(piece)
+
+        self._stats = stats
+        start = default_timer()
+        try:
+            self._write_html(write_counted, chunk_rows)
+        finally:
+            self._stats = None
+        stats.seconds = default_timer() - start
+        self.stats = stats
+        self.report_stats(stats)
+
+    def _html_overridden(self):
+        """Whether __html__ or tbody have been overridden, so that the
+        table can't be rendered a piece at a time. Only the entry points
+        other than __html__ check this, as an overridden __html__ may
+        well call Table's.
+
+        """
+        return overrides(self, Table, '__html__') or overrides(
+            self, Table, 'tbody')
+
+    def _write_html(self, write, chunk_rows):
+        chunks, write_chunk = self._tr_chunk_writer(
+            write, chunk_rows or self.chunk_rows)
+        first = next(chunks, None)
+        for piece, rows_follow in self._iter_framing(first is not None):
+            write(piece)
+            if rows_follow:
+                write_chunk(first)
+                for chunk in chunks:
+                    write_chunk(chunk)
+
+    def _iter_framing(self, has_rows):
+        """Generate the html around the table's rows, in the pieces that
+        iter_html yields, as pairs of a piece and whether the rows go
+        straight after it. We need to know whether there are any rows
+        before we can decide between outputting the table and
+        outputting no_items.
+
+        The pager is only rendered once the rows have been, as it may
+        need to know whether they reached the next page.
+
+        """
+        if not has_rows and not self.allow_empty:
+            yield element('p', content=self.no_items), False
+        else:
+            yield '{table}\n{thead}\n'.format(
+                table=open_tag('table', attrs=self.get_html_attrs()),
+                thead=self.thead()), False
+            if has_rows:
+                yield open_tag('tbody'), True
+                yield '\n' + close_tag('tbody'), False
+            yield '\n' + close_tag('table'), False
+        pager = self.pager()
+        if pager:
+            yield '\n' + pager, False
+
+    def _tr_chunk_writer(self, write, chunk_rows):
+        """Return an iterator of chunks, and a function that writes a
+        chunk's <tr>s, each after a newline. If the rows can go
+        straight from the row renderer, then the chunks are of items,
+        which are rendered as they are written. Otherwise they are
+        lists of <tr>s, from _iter_tr_chunks.
+
+        """
+        renderer = self._get_row_renderer()
+        if not (isinstance(renderer, _RowRenderer) and
+                not renderer.concurrent and not self.processes and
+                self._stats is None and
+                not overrides(self, Table, 'row_cache_key')):
+            def write_trs(trs):
+                write('\n')
+                write('\n'.join(trs))
+            return self._iter_tr_chunks(chunk_rows), write_trs
+
+        items = self._page_items
+        if items is None:
+            items = self.get_items()
+        if isinstance(items, ColumnarItems):
+            def write_columns(chunk):
+                renderer.write_columns(chunk, write)
+            return iter(items.iter_chunks(chunk_rows)), write_columns
+
+        def write_items(chunk):
+            renderer.write(chunk, write)
+        return _iter_chunks(items, chunk_rows), write_items
+
+    def _iter_timed(self, pieces):
+        """Generate pieces, timing how long it takes to generate them (but
+        not how long the caller takes in between), then report the
+        stats.
+
+        """
+        stats = RenderStats()
+        pieces = iter(pieces)
+        while True:
+            self._stats = stats
+            start = default_timer()
+            try:
+                piece = next(pieces)
+            except StopIteration:
+                break
+            finally:
+                stats.seconds += default_timer() - start
+                self._stats = None
+            stats.bytes += len(piece.encode('utf-8'))
+            yield piece
+        self.stats = stats
+        self.report_stats(stats)
+
+    def report_stats(self, stats):
+        """Called with the RenderStats after each render, when instrument
+        is set. This passes them to stats_callback, if it is set, eg to
+        send them to a metrics service. Override this to do something
+        else with them.
+
+        """
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+
+    def _iter_whole_html(self):
+        yield self.__html__()
+
+    def _iter_html(self, chunk_rows):
+        chunks = self._iter_tr_chunks(chunk_rows or self.chunk_rows)
+        first = next(chunks, None)
+        for piece, rows_follow in self._iter_framing(first is not None):
+            if not rows_follow:
+                yield piece
+                continue
+            yield '{}\n{}'.format(piece, '\n'.join(first))
+            for chunk in chunks:
+                yield '\n' + '\n'.join(chunk)
+
+    def aiter_html(self, chunk_rows=None):
+        """An async version of iter_html, for async views:
+
+        async for chunk in table.aiter_html():
+            ...
+
+        The items can also be an async iterable, such as an async
+        database cursor, in which case each chunk of rows is rendered
+        as soon as it has arrived. Columns can also have async
+        td_contents, and these are awaited together for each chunk.
+
+        This needs Python 3.6 or later.
+
+        """
+        from .aio import aiter_html
+        return aiter_html(self, chunk_rows)
+
+    def iter_csv(self, chunk_rows=None, header=True, **fmtparams):
+        """Generate the table's rows as CSV, a chunk of chunk_rows rows
+        at a time, with a header row of the column names (unless header
+        is False). Any other kwargs are passed on to csv.writer, eg
+        delimiter=';'.
+
+        Each of the visible columns gives what its export_format gives
+        for each item: for most columns, that is the text that the
+        table shows, without any html escaping. A LinkCol gives the
+        text of its link, and a NestedTableCol gives the rows of its
+        table, as JSON. The items are read a chunk at a time, so large
+        tables can be streamed:
+
+        return Response(table.iter_csv(), mimetype='text/csv')
+
+        """
+        if _PY2_CSV:
+            # Python 2's csv module only reads and writes byte strings.
+            buf = io.BytesIO()
+            fmtparams = dict(
+                (k, v.encode('utf-8') if isinstance(v, text_type) else v)
+                for k, v in fmtparams.items())
+        else:
+            buf = io.StringIO()
+        writer = csv.writer(buf, **fmtparams)
+
+        def flush():
+            out = buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            return out.decode('utf-8') if _PY2_CSV else out
+
+        if header:
+            writer.writerow([_csv_value(text_type(col.name))
+                             for _, col in self._export_cols()])
+            yield flush()
+        for rows in self._iter_export_chunks(chunk_rows):
+            writer.writerows(
+                [[_csv_value(value) for value in row] for row in rows])
+            yield flush()
+
+    def iter_jsonl(self, chunk_rows=None):
+        """Generate the table's rows as JSON Lines, a chunk of chunk_rows
+        rows at a time. Each row is an object of the visible columns'
+        keys to what they export, as for iter_csv, except that values
+        that JSON can represent, such as numbers and None, are kept as
+        they are, and a NestedTableCol gives a list of its rows. Other
+        values, such as dates from columns that don't format them, are
+        converted to strings.
+
+        """
+        for rows in self._iter_export_dicts(chunk_rows):
+            yield ''.join(
+                json.dumps(row, default=text_type) + '\n' for row in rows)
+
+    def _export_cols(self):
+        return [(key, col) for key, col in self._cols.items() if col.show]
+
+    def _iter_export_chunks(self, chunk_rows=None):
+        """Generate lists of the rows of what each visible column exports
+        for each item, a chunk of items at a time.
+
+        """
+        exports = [col._compile_exports(key)
+                   for key, col in self._export_cols()]
+        for chunk in _iter_chunks(self.get_items(),
+                                  chunk_rows or self.chunk_rows):
+            if exports:
+                yield list(zip(*[export(chunk) for export in exports]))
+            else:
+                yield [()] * len(chunk)
+
+    def _iter_export_dicts(self, chunk_rows=None):
+        keys = [key for key, _ in self._export_cols()]
+        for rows in self._iter_export_chunks(chunk_rows):
+            yield [OrderedDict(zip(keys, row)) for row in rows]
 
     def thead(self):
+        if not self.thead_cache_size:
+            return self._thead()
+        key = self.thead_cache_key()
+        if key is None:
+            return self._thead()
+
+        cache = self._get_class_cache('_thead_cache', self.thead_cache_size)
+        thead = cache.get(key)
+        if thead is None:
+            thead = self._thead()
+            cache.set(key, thead)
+        return thead
+
+    def thead_cache_key(self):
+        """Return the key to cache the rendered <thead> under, when
+        thead_cache_size is set. This needs to include everything that
+        the <thead> depends on. By default, that is the visible
+        columns, the sort options, the <thead> attributes and the
+        current locale.
+
+        If your sort_url depends on anything else, such as the
+        request's args, then override this to add it to the key. Or
+        return None to not use the cache.
+
+        """
+        return (
+            tuple((k, c, c.name, c.allow_sort, c.formatted_th_html_attrs)
+                  for k, c in self._cols.items() if c.show),
+            self.allow_sort,
+            self.sort_by,
+            self.sort_reverse,
+            tuple(sorted(self.get_thead_attrs().items())),
+            str(get_locale()),
+        )
+
+    def row_cache_key(self, item):
+        """Return the key to cache the rendered <tr> for item under, when
+        row caching is on, or None to not cache it. This needs to
+        change whenever the row would, so should be something like the
+        item's primary key along with when it was last updated. It
+        doesn't need to include the locale or the visible columns, as
+        those get added to it.
+
+        By default, this returns None, so nothing is cached.
+
+        """
+        return None
+
+    @classmethod
+    def get_row_cache(cls):
+        """Return the cache used for the rendered <tr>s, or None if row
+        caching is off. Its hits and misses count how it has done.
+
+        """
+        if cls.row_cache is not None:
+            return cls.row_cache
+        if not cls.row_cache_size:
+            return None
+        return cls._get_class_cache('_row_cache', cls.row_cache_size)
+
+    @classmethod
+    def invalidate_row(cls, key):
+        """Remove the cached <tr>s for the row_cache_key key, in every
+        locale and for every set of columns that it has been cached
+        for.
+
+        """
+        cache = cls.get_row_cache()
+        if cache is None:
+            return
+        for prefix in list(cls.__dict__.get('_row_cache_prefixes', ())):
+            cache.delete((prefix, key))
+
+    @classmethod
+    def clear_row_cache(cls):
+        cache = cls.get_row_cache()
+        if cache is not None:
+            cache.clear()
+
+    def etag_key(self):
+        """Return what, along with the row_cache_key of each item to be
+        shown, the whole table's html depends on, for make_response to
+        work out its ETag from. By default, this is the table's
+        options, the visible columns and the locale.
+
+        If the html depends on anything else, such as the request's
+        args in sort_url, override this to add it. Or return None to
+        not use an ETag.
+
+        """
+        cls = type(self)
+        return (
+            cls.__module__,
+            cls.__name__,
+            tuple(_col_signature(k, c) + (
+                c.name, c.allow_sort, c.formatted_th_html_attrs,
+                c.formatted_td_html_attrs)
+                for k, c in self._cols.items() if c.show),
+            sorted(self.get_html_attrs().items()),
+            sorted(self.get_thead_attrs().items()),
+            self.allow_sort,
+            self.sort_by,
+            self.sort_reverse,
+            self.get_page() if self.per_page else None,
+            self.per_page,
+            self.limit,
+            self.no_items,
+            self.allow_empty,
+            str(get_locale()),
+        )
+
+    def get_etag(self, items):
+        """Return an ETag for the table showing items, or None if there
+        isn't one, because etag_key or the row_cache_key of any of the
+        items is None.
+
+        """
+        key = self.etag_key()
+        if key is None:
+            return None
+        item_keys = [self.row_cache_key(item) for item in items]
+        if any(item_key is None for item_key in item_keys):
+            return None
+        # The pager is cheap to render, and depends on how many items
+        # there are in total.
+        data = repr((key, item_keys, self.pager()))
+        return sha1(data.encode('utf-8')).hexdigest()
+
+    def make_response(self):
+        """Return a Flask response of the table's html, with an ETag
+        worked out from the items' row_cache_keys before rendering
+        anything. If the request's If-None-Match has that ETag, then
+        the response is a 304 Not Modified, without rendering the
+        table. Otherwise, the html is taken from the cache when
+        html_cache_size (or html_cache) is set, or else rendered.
+
+        """
+        from flask import make_response, request
+        items = self.get_items()
+        if not isinstance(items, (list, ColumnarItems)):
+            items = list(items)
+        etag = self.get_etag(items)
+
+        self._page_items = items
+        try:
+            if etag is None:
+                return make_response(self.__html__())
+            if etag in request.if_none_match:
+                response = make_response('', 304)
+            else:
+                response = make_response(self._cached_html(etag))
+        finally:
+            self._page_items = None
+        response.set_etag(etag)
+        return response
+
+    def _cached_html(self, etag):
+        cache = self.html_cache
+        if cache is None and self.html_cache_size:
+            cache = self._get_class_cache('_html_cache', self.html_cache_size)
+        if cache is None:
+            return self.__html__()
+        html = cache.get(etag)
+        if html is None:
+            html = self.__html__()
+            cache.set(etag, html)
+        return html
+
+    def _row_cache_prefix(self):
+        """Return what, along with row_cache_key, the cached <tr>s
+        depend on: the table, its visible columns (their types and
+        attr_lists, as tables made by create_table all have the same
+        name) and the locale.
+
+        """
+        cls = type(self)
+        cols = [(k, c) for k, c in self._cols.items() if c.show]
+        prefix = (
+            cls.__module__,
+            cls.__name__,
+            tuple(_col_signature(k, c) for k, c in cols),
+            tuple(c.formatted_td_html_attrs for _, c in cols),
+            str(get_locale()),
+        )
+        prefixes = cls.__dict__.get('_row_cache_prefixes')
+        if prefixes is None:
+            prefixes = cls._row_cache_prefixes = set()
+        prefixes.add(prefix)
+        return prefix
+
+    @classmethod
+    def _get_class_cache(cls, name, maxsize):
+        """Get (or create) the cache that this class keeps under
+        name. These are per class, and not inherited.
+
+        """
+        cache = cls.__dict__.get(name)
+        if cache is None or cache.maxsize != maxsize:
+            cache = LRUCache(maxsize)
+            setattr(cls, name, cache)
+        return cache
+
+    def _thead(self):
         ths = ''.join(
             self.th(col_key, col)
             for col_key, col in self._cols.items()
@@ -127,12 +937,336 @@ class Table(with_metaclass(TableMeta)):
         )
 
     def tbody(self):
-        out = [self.tr(item) for item in self.items]
+        out = [tr for chunk in self._iter_tr_chunks(self.chunk_rows)
+               for tr in chunk]
         if not out:
             return ''
         content = '\n{}\n'.format('\n'.join(out))
         return element('tbody', content=content, escape_content=False)
 
+    def _get_row_renderer(self):
+        """Return a function that renders an item as a <tr>. This is the
+        compiled _RowRenderer for this class, unless tr or
+        get_tr_attrs have been overridden, in which case we have to
+        just use tr.
+
+        """
+        cls = type(self)
+        if overrides(cls, Table, 'tr') or overrides(
+                cls, Table, 'get_tr_attrs'):
+            return self.tr
+
+        # The columns can change after the class is created, so check
+        # that the cached renderer is for the current columns and the
+        # current settings that they were compiled from.
+        cols = tuple((k, c) for k, c in self._cols.items() if c.show)
+        signatures = tuple(c._render_signature() for _, c in cols)
+        renderer = cls.__dict__.get('_row_renderer')
+        if (renderer is None or renderer.cols != cols or
+                renderer.signatures != signatures):
+            renderer = _RowRenderer(cols)
+            cls._row_renderer = renderer
+        return renderer
+
+    def get_items(self):
+        """Return the items to render. That is just the items that the
+        table was given, unless sort_items is set, in which case they
+        are sorted by sort_by and sort_reverse. Then if limit is set,
+        only the first limit of them, and if per_page is set, only
+        those on the current page.
+
+        When sorting with a limit or pages, the items aren't all
+        sorted, just the first up to the end of the page are picked
+        out (in O(n log k) time), giving the same as a full sort
+        would. Otherwise, the items are sliced lazily: query objects
+        with offset and limit methods (eg SQLAlchemy queries) are
+        given an offset and limit, sequences are sliced, and anything
+        else is read only as far as the end of the page.
+
+        """
+        items = self.items
+        start, stop = self._get_item_range()
+        sort_key = self.get_sort_key() if self.sort_items else None
+        if sort_key is not None:
+            items = self._sorted_page(items, sort_key, stop)
+            if start:
+                items = _sliced(items, start, None)
+        elif start or stop is not None:
+            if self.per_page and _is_unsized(items):
+                # Read one more item than we need, to find out if there
+                # is a next page.
+                items = list(_sliced(items, start, stop + 1))
+                self._has_next_page = len(items) > stop - start and (
+                    self.limit is None or stop < self.limit)
+                items = items[:stop - start]
+            else:
+                items = _sliced(items, start, stop)
+        return items
+
+    def _sorted_page(self, items, sort_key, stop):
+        """Return items sorted by sort_key, up to stop. If the table is
+        paginated and the pager can't count the items, this also notes
+        whether there is a next page.
+
+        """
+        if not (self.per_page and _is_unsized(self.items)):
+            return _sorted(items, sort_key, self.sort_reverse, stop)
+        # As for unsorted items, pick out one more item than we need, to
+        # find out if there is a next page.
+        items = _sorted(items, sort_key, self.sort_reverse, stop + 1)
+        self._has_next_page = len(items) > stop and (
+            self.limit is None or stop < self.limit)
+        return items[:stop]
+
+    def _get_item_range(self):
+        """Return the start and stop (which may be None) indices of the
+        items to render, from limit, page and per_page.
+
+        """
+        start, stop = 0, self.limit
+        if self.per_page:
+            start = (self.get_page() - 1) * self.per_page
+            end = start + self.per_page
+            stop = end if stop is None else max(start, min(stop, end))
+        return start, stop
+
+    def get_page(self):
+        """Return the current page, counting from 1. page can safely
+        come straight from the request, as anything that isn't a
+        positive whole number is taken as the first page.
+
+        """
+        try:
+            page = int(self.page)
+        except (TypeError, ValueError):
+            return 1
+        return max(page, 1)
+
+    def get_page_count(self):
+        """Return how many pages there are, or None if that can't be
+        known without reading all of the items, eg for an iterator.
+
+        """
+        total = self.get_item_count()
+        if total is None:
+            return None
+        if self.limit is not None:
+            total = min(total, self.limit)
+        return max(1, -(-total // self.per_page))
+
+    def get_item_count(self):
+        """Return how many items there are in total, or None if that
+        can't be known without reading all of them.
+
+        """
+        return _count(self.items)
+
+    def page_url(self, page):
+        raise NotImplementedError('page_url not implemented')
+
+    def pager(self):
+        """Return the html for the links to the other pages, or '' if
+        the table isn't paginated or there is only one page.
+
+        The links go to the urls given by page_url, which needs to be
+        declared for a paginated table.
+
+        """
+        if not self.per_page:
+            return ''
+        page = self.get_page()
+        page_count = self.get_page_count()
+        if page_count is None:
+            has_next = getattr(self, '_has_next_page', False)
+            last = page + 1 if has_next else page
+        else:
+            has_next = page < page_count
+            last = page_count
+        if last == 1:
+            return ''
+
+        window = self.pager_window
+        pages = [p for p in range(1, last + 1)
+                 if p == 1 or p == last or abs(p - page) <= window]
+
+        lis = []
+        if page > 1:
+            lis.append(self.pager_li(page - 1, gettext('Previous')))
+        prev = None
+        for p in pages:
+            if prev is not None and p > prev + 1:
+                lis.append(element('li', content='…'))
+            lis.append(self.pager_li(p, p, active=(p == page)))
+            prev = p
+        if has_next:
+            lis.append(self.pager_li(page + 1, gettext('Next')))
+
+        attrs = {}
+        if self.pager_classes:
+            attrs['class'] = ' '.join(self.pager_classes)
+        return element(
+            'ul',
+            attrs=attrs,
+            content='\n{}\n'.format('\n'.join(lis)),
+            escape_content=False)
+
+    def pager_li(self, page, label, active=False):
+        if active:
+            return element(
+                'li', attrs={'class': 'active'},
+                content=element('span', content=label),
+                escape_content=False)
+        return element(
+            'li',
+            content=element(
+                'a', attrs=dict(href=self.page_url(page)), content=label),
+            escape_content=False)
+
+    def get_sort_key(self):
+        """Return a function that gives the key to sort an item by, for
+        the column given by sort_by, or a tuple of keys for a list of
+        columns. Each column's key comes from the same value that it
+        displays, passed through the column's sort_key if it has
+        one. Return None if there is nothing to sort by.
+
+        Keys in sort_by that aren't columns that allow sorting are
+        ignored, so sort_by can safely come straight from the request.
+
+        """
+        sort_by = self.sort_by
+        if not sort_by:
+            return None
+        if not isinstance(sort_by, (list, tuple)):
+            sort_by = [sort_by]
+
+        keys = []
+        for col_key in sort_by:
+            col = self._cols.get(col_key)
+            if col is None or not col.allow_sort:
+                continue
+            key = col._compile_sort_key(col_key)
+            if key is not None:
+                keys.append(key)
+
+        if not keys:
+            return None
+        if len(keys) == 1:
+            return keys[0]
+        return lambda item: tuple([key(item) for key in keys])
+
+    def _iter_tr_chunks(self, chunk_rows):
+        renderer = self._get_row_renderer()
+        if self._stats is not None:
+            for chunk in self._iter_timed_chunks(renderer, chunk_rows):
+                yield chunk
+            return
+        if not (isinstance(renderer, _RowRenderer) and renderer.concurrent):
+            for chunk in self._iter_rendered(renderer, None, chunk_rows):
+                yield chunk
+            return
+
+        from .parallel import CellPool
+        try:
+            pool = CellPool(self.concurrent_workers, self.concurrent_timeout)
+        except ImportError:
+            # Without concurrent.futures, just render them here.
+            pool = None
+        try:
+            for chunk in self._iter_rendered(renderer, pool, chunk_rows):
+                yield chunk
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def _iter_timed_chunks(self, renderer, chunk_rows):
+        """Render the chunks of rows in this thread, timing each phase of
+        each column into _stats as we go.
+
+        """
+        stats = self._stats
+        if isinstance(renderer, _RowRenderer):
+            def render(chunk):
+                return renderer.render_timed(chunk, stats)
+        else:
+            def render(chunk):
+                return [renderer(item) for item in chunk]
+        for chunk in self._iter_rendered(renderer, None, chunk_rows, render):
+            stats.rows += len(chunk)
+            yield chunk
+
+    def _iter_rendered(self, renderer, pool, chunk_rows, render=None):
+        items = self._page_items
+        if items is None:
+            items = self.get_items()
+        # A render is given when timing, which has to be done here.
+        serial = render is not None
+        if render is None and isinstance(renderer, _RowRenderer):
+            def render(chunk):
+                return renderer.render(chunk, pool)
+        elif render is None:
+            def render(chunk):
+                return [renderer(item) for item in chunk]
+
+        cache = None
+        if overrides(self, Table, 'row_cache_key'):
+            cache = self.get_row_cache()
+        if cache is not None:
+            prefix = self._row_cache_prefix()
+            pending = deque()
+
+            def misses():
+                for chunk in _iter_chunks(items, chunk_rows):
+                    keys, trs, missing = self._get_cached_trs(
+                        chunk, cache, prefix)
+                    pending.append((keys, trs, missing))
+                    yield [chunk[i] for i in missing]
+
+            for rendered in self._render_chunks(misses(), render, serial):
+                keys, trs, missing = pending.popleft()
+                self._set_cached_trs(
+                    keys, trs, missing, rendered, cache, prefix)
+                yield trs
+        elif (isinstance(renderer, _RowRenderer) and
+                isinstance(items, ColumnarItems) and
+                not (serial or self.processes or pool)):
+            for chunk in items.iter_chunks(chunk_rows):
+                yield renderer.render_columns(chunk)
+        else:
+            for rendered in self._render_chunks(
+                    _iter_chunks(items, chunk_rows), render, serial):
+                yield rendered
+
+    def _render_chunks(self, chunks, render, serial=False):
+        """Generate render(chunk) for each of chunks, in this process, or
+        in other processes if processes is set (and serial isn't).
+
+        """
+        if self.processes and not serial:
+            from .parallel import iter_render
+            return iter_render(self, chunks, render)
+        return (render(chunk) for chunk in chunks)
+
+    def _get_cached_trs(self, chunk, cache, prefix):
+        """Return the row_cache_keys of the items in chunk, their <tr>s
+        from the cache (or None), and the indices of those missing.
+
+        """
+        keys = [self.row_cache_key(item) for item in chunk]
+        trs = [None] * len(chunk)
+        missing = []
+        for i, key in enumerate(keys):
+            if key is not None:
+                trs[i] = cache.get((prefix, key))
+            if trs[i] is None:
+                missing.append(i)
+        return keys, trs, missing
+
+    def _set_cached_trs(self, keys, trs, missing, rendered, cache, prefix):
+        for i, tr in zip(missing, rendered):
+            trs[i] = tr
+            if keys[i] is not None:
+                cache.set((prefix, keys[i]), tr)
+
     def get_tr_attrs(self, item):
         return {}
 
@@ -167,18 +1301,119 @@ class Table(with_metaclass(TableMeta)):
             'th',
             content=self.th_contents(col_key, col),
             escape_content=False,
-            attrs=col.th_html_attrs,
+            formatted_attrs=col.formatted_th_html_attrs,
         )
 
     def sort_url(self, col_id, reverse=False):
         raise NotImplementedError('sort_url not implemented')
 
+    @classmethod
+    def from_columns(cls, columns, **kwargs):
+        """Create a table from columns of data rather than rows. columns
+        should be a mapping of name to a sequence of values, such as a
+        dict of lists, or of NumPy arrays, or a pandas DataFrame. Each
+        of the table's columns is bound to the column named by the
+        first key of its attr_list, and any other kwargs are passed
+        on to the table as usual.
+
+        """
+        return cls(ColumnarItems(columns), **kwargs)
+
     @classmethod
     def add_column(cls, name, col):
         cls._cols[name] = col
         return cls
 
 
+def _sorted(items, key, reverse=False, limit=None):
+    """Sort items, which may be ColumnarItems, by key. If there is a
+    limit, only return that many of them, picked out with
+    nsmallest/nlargest rather than sorting everything. These give the
+    same result as sorted()[:limit], ties and all.
+
+    """
+    if isinstance(items, ColumnarItems):
+        rows = list(items)
+        order = _sorted(
+            range(len(rows)), lambda i: key(rows[i]), reverse, limit)
+        return items.take(order)
+    if limit is None:
+        return sorted(items, key=key, reverse=reverse)
+    if reverse:
+        return nlargest(limit, items, key=key)
+    return nsmallest(limit, items, key=key)
+
+
+def _is_query(items):
+    return callable(getattr(items, 'offset', None)) and callable(
+        getattr(items, 'limit', None))
+
+
+def _is_unsized(items):
+    return not (_is_query(items) or hasattr(items, '__len__'))
+
+
+def _count(items):
+    if _is_query(items) and callable(getattr(items, 'count', None)):
+        return items.count()
+    if hasattr(items, '__len__'):
+        return len(items)
+    return None
+
+
+def _sliced(items, start, stop):
+    """Return items[start:stop], without reading any more of items than
+    is needed. stop may be None, for all the rest of the items.
+
+    """
+    if isinstance(items, ColumnarItems):
+        stop = len(items) if stop is None else min(stop, len(items))
+        return items.take(range(start, stop))
+    if _is_query(items):
+        if start:
+            items = items.offset(start)
+        if stop is not None:
+            items = items.limit(stop - start)
+        return items
+    if hasattr(items, '__getitem__') and hasattr(items, '__len__'):
+        try:
+            return items[start:stop]
+        except (TypeError, KeyError):
+            pass
+    return islice(items, start, stop)
+
+
+def _col_signature(key, col):
+    """Return the key, type and attr_list of a column, to tell apart
+    the columns of tables with the same name in cache keys.
+
+    """
+    cls = type(col)
+    attr_list = col.get_attr_list(key)
+    return (key, cls.__module__, getattr(cls, '__qualname__', cls.__name__),
+            tuple(attr_list) if attr_list else None)
+
+
+_PY2_CSV = sys.version_info[0] < 3
+
+
+def _csv_value(value):
+    if isinstance(value, (list, tuple, dict)):
+        value = json.dumps(value, default=text_type)
+    if _PY2_CSV and isinstance(value, text_type):
+        return value.encode('utf-8')
+    return value
+
+
+def _iter_chunks(items, chunk_rows):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
 def create_table(name=str('_Table'), base=Table, options=None):
     """Creates and returns a new table class. You can specify a name for
     you class if you wish. You can also set the base class (or
@@ -0,0 +1,107 @@
+import re
+
+from flask import current_app, url_for
+
+# The syntax of a variable in a werkzeug rule, eg <int:id>.
+_rule_var_re = re.compile(r'''
+    <
+    (?:
+        (?P<converter>[a-zA-Z_][a-zA-Z0-9_]*)
+        (?:\((?P<args>.*?)\))?
+        \:
+    )?
+    (?P<variable>[a-zA-Z_][a-zA-Z0-9_]*)
+    >
+''', re.VERBOSE)
+
+
+def _url_template(endpoint, arg_names):
+    """Return the rule for endpoint as a list of its static parts and
+    (variable, converter) pairs, if it is simple enough to just build
+    urls by filling in the values. That means the endpoint has exactly
+    one rule, which takes exactly arg_names, with no defaults,
+    subdomains, converter arguments or url_defaults functions that
+    could change things. Otherwise return None.
+
+    """
+    app = current_app
+    url_map = app.url_map
+    if endpoint.startswith('.') or url_map.host_matching:
+        return None
+    if any(app.url_default_functions.values()):
+        return None
+
+    rules = list(url_map.iter_rules(endpoint))
+    if len(rules) != 1:
+        return None
+    rule = rules[0]
+    if rule.defaults or rule.subdomain or set(rule.arguments) != arg_names:
+        return None
+
+    parts = []
+    pos = 0
+    for match in _rule_var_re.finditer(rule.rule):
+        if match.group('args') is not None:
+            return None
+        converter = url_map.converters.get(match.group('converter') or
+                                           'default')
+        if converter is None:
+            return None
+        parts.append(rule.rule[pos:match.start()])
+        parts.append((match.group('variable'), converter(url_map)))
+        pos = match.end()
+    parts.append(rule.rule[pos:])
+    return parts
+
+
+def _fill_template(template, kwargs):
+    out = []
+    for part in template:
+        if isinstance(part, tuple):
+            variable, converter = part
+            out.append(converter.to_url(kwargs[variable]))
+        else:
+            out.append(part)
+    return ''.join(out)
+
+
+def compile_url_for(endpoint, url_kwargs, first_item):
+    """Return a function that, given an item, returns the same as
+    url_for(endpoint, **url_kwargs(item)).
+
+    Where possible, this builds the urls from a template of the
+    endpoint's rule, rather than going through url_for for each item.
+    The template is checked against url_for for first_item, which also
+    gives the prefix (script root, or scheme and host for external
+    urls) to put in front of each url. Anything that the template
+    can't do in the same way as url_for goes through url_for.
+
+    """
+    def slow_url(item):
+        return url_for(endpoint, **url_kwargs(item))
+
+    kwargs = url_kwargs(first_item)
+    template = _url_template(endpoint, set(kwargs))
+    if template is None:
+        return slow_url
+
+    expected = url_for(endpoint, **kwargs)
+    try:
+        built = _fill_template(template, kwargs)
+    except Exception:
+        return slow_url
+    if not expected.endswith(built):
+        return slow_url
+    prefix = expected[:len(expected) - len(built)]
+
+    def url(item):
+        kwargs = url_kwargs(item)
+        if not any(value is None for value in kwargs.values()):
+            try:
+                return prefix + _fill_template(template, kwargs)
+            except Exception:
+                pass
+        # Let url_for deal with values that the converters can't.
+        return url_for(endpoint, **kwargs)
+
+    return url
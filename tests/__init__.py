@@ -2,6 +2,8 @@
 from __future__ import unicode_literals
 
 import os
+import pickle
+import subprocess
 # Set all of our environment variables before we import other things
 # that may read these at import time. We also use noqa to stop pep8
 # from worrying about imports not being at the top of the file.
@@ -10,13 +12,41 @@ for name in ['LANGUAGE', 'LC_ALL', 'LC_CTYPE', 'LC_MESSAGES', 'LC_TIME']:  # noq
 os.environ['LANGUAGE'] = 'en_GB.UTF-8'  # noqa
 
 import io
+import json
+import sys
+import tempfile
+import time
 import unittest
-from flask import Flask, url_for
+from flask import Flask, Markup, Response, stream_with_context, url_for
 from flask_table import (Table, Col, LinkCol, ButtonCol, OptCol, BoolCol,
                          DateCol, DatetimeCol, NestedTableCol, create_table,
-                         BoolNaCol)
+                         BoolNaCol, ColumnarItems)
+from babel.dates import format_date, format_datetime
+from flask_babel import Babel
+from flask_table.cache import LRUCache
+from flask_table.columns import _map_distinct
+from flask_table.html import element, escape_many
+import flask_table.i18n
+import flask_table.urls
+from flask_table import bench
 import flask_testing
-from datetime import date, datetime
+from werkzeug.routing import BuildError
+from datetime import date, datetime, timedelta
+try:
+    from datetime import timezone
+except ImportError:
+    timezone = None
+from decimal import Decimal
+
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
+try:
+    import sqlalchemy
+except ImportError:
+    sqlalchemy = None
 
 
 class Item(object):
@@ -107,6 +137,10 @@ def test_app():
     def delete(id_):
         return 'Delete {}'.format(id_)
 
+    @app.route('/name/<name>')
+    def by_name(name):
+        return 'Name {}'.format(name)
+
     return app
 
 
@@ -874,6 +908,133 @@ class SortingTest(FlaskTableTest):
             'sorting_test', 'test_sorted_reverse', items, table=tab)
 
 
+class PaginationTest(TableTest):
+
+    class MyTable(Table):
+        per_page = 2
+        number = Col('Number')
+
+        def page_url(self, page):
+            return '?page={}'.format(page)
+
+    items = [{'number': i} for i in range(1, 8)]
+
+    def numbers(self, items, **kwargs):
+        tab = self.MyTable(items, **kwargs)
+        return [item['number'] for item in tab.get_items()]
+
+    def test_page(self):
+        self.assert_html_equivalent_from_file(
+            'pagination_test', 'test_page', self.items,
+            table_kwargs=dict(page=2))
+
+    def test_slicing(self):
+        self.assertEqual(self.numbers(self.items), [1, 2])
+        self.assertEqual(self.numbers(self.items, page=4), [7])
+        self.assertEqual(self.numbers(self.items, page=5), [])
+        self.assertEqual(self.numbers(self.items, page='x'), [1, 2])
+        self.assertEqual(self.numbers(self.items, page=2, per_page=3),
+                         [4, 5, 6])
+        self.assertEqual(self.numbers(self.items, page=2, limit=3), [3])
+
+    def test_iterator_is_read_lazily(self):
+        def gen():
+            for item in self.items:
+                read.append(item['number'])
+                yield item
+        read = []
+        tab = self.MyTable(gen(), page=2)
+        html = tab.__html__()
+        self.assertEqual(read, [1, 2, 3, 4, 5])
+        self.assert_in('<li><a href="?page=3">Next</a></li>', html)
+        self.assert_not_in('?page=4', html)
+
+    def test_iterator_last_page(self):
+        tab = self.MyTable(iter(self.items), page=4)
+        html = tab.__html__()
+        self.assert_in('<li><a href="?page=3">Previous</a></li>', html)
+        self.assert_not_in('Next', html)
+
+    def test_query(self):
+        class Query(object):
+            def __init__(self, items):
+                self.items = items
+                self.calls = []
+
+            def offset(self, n):
+                self.calls.append(('offset', n))
+                return Query(self.items[n:])
+
+            def limit(self, n):
+                self.calls.append(('limit', n))
+                return Query(self.items[:n])
+
+            def count(self):
+                return len(self.items)
+
+            def __iter__(self):
+                return iter(self.items)
+
+        query = Query(self.items)
+        self.assertEqual(self.numbers(query, page=3), [5, 6])
+        self.assertEqual(query.calls, [('offset', 4)])
+        self.assertEqual(self.MyTable(query).get_page_count(), 4)
+
+    def test_sorted(self):
+        self.assertEqual(
+            self.numbers(self.items, page=2, sort_items=True,
+                         sort_by='number', sort_reverse=True),
+            [5, 4])
+
+    def test_sorted_iterator(self):
+        kwargs = dict(sort_items=True, sort_by='number', sort_reverse=True)
+        tab = self.MyTable(iter(self.items), page=2, **kwargs)
+        html = tab.__html__()
+        self.assert_in('<td>5</td>', html)
+        self.assert_in('<li><a href="?page=3">Next</a></li>', html)
+        tab = self.MyTable(iter(self.items), page=4, **kwargs)
+        html = tab.__html__()
+        self.assert_in('<td>1</td>', html)
+        self.assert_not_in('Next', html)
+
+    def test_pager_window(self):
+        items = [{'number': i} for i in range(20)]
+        html = html_reduce(self.MyTable(items, page=5).pager())
+        self.assertEqual(
+            html,
+            '<ul class="pagination">'
+            '<li><a href="?page=4">Previous</a></li>'
+            '<li><a href="?page=1">1</a></li>'
+            '<li>…</li>'
+            '<li><a href="?page=3">3</a></li>'
+            '<li><a href="?page=4">4</a></li>'
+            '<li class="active"><span>5</span></li>'
+            '<li><a href="?page=6">6</a></li>'
+            '<li><a href="?page=7">7</a></li>'
+            '<li>…</li>'
+            '<li><a href="?page=10">10</a></li>'
+            '<li><a href="?page=6">Next</a></li>'
+            '</ul>')
+
+    def test_one_page(self):
+        tab = self.MyTable(self.items, per_page=10)
+        self.assertEqual(tab.pager(), '')
+        self.assert_not_in('<ul', tab.__html__())
+
+    def test_iter_html(self):
+        tab = self.MyTable(self.items, page=3)
+        self.assertEqual(''.join(tab.iter_html(chunk_rows=1)),
+                         self.MyTable(self.items, page=3).__html__())
+
+    def test_page_url_not_set(self):
+        class MyTable(Table):
+            per_page = 2
+            number = Col('Number')
+
+        with self.assertRaises(NotImplementedError):
+            MyTable(self.items).__html__()
+
+
 class GeneratorTest(TableTest):
 
     class MyTable(Table):
@@ -1017,3 +1178,1695 @@ class TableHTMLAttrsOnClassTest(TableTest):
             'html_attrs_test',
             'test_html_attrs',
             items)
+
+
+class IterHtmlTest(TableTest):
+
+    class MyTable(Table):
+        number = Col('Number')
+
+    def gen_nums(self, upto):
+        for i in range(1, upto + 1):
+            yield {'number': i}
+
+    def test_ten(self):
+        tab = self.table_cls(self.gen_nums(10))
+        chunks = list(tab.iter_html(chunk_rows=3))
+        # Opening tags and thead, 4 chunks of rows, </tbody>, </table>
+        self.assertEqual(len(chunks), 7)
+        self.assertEqual(
+            html_reduce(''.join(chunks)),
+            html_reduce(self.get_html('generator_test', 'test_ten')))
+
+    def test_same_as_html(self):
+        items = list(self.gen_nums(10))
+        tab = self.table_cls(items)
+        self.assertEqual(''.join(tab.iter_html(chunk_rows=4)), tab.__html__())
+
+    def test_empty(self):
+        tab = self.table_cls(self.gen_nums(0))
+        self.assertEqual(
+            list(tab.iter_html()), ['<p>No Items</p>'])
+
+    def test_empty_allow_empty(self):
+        tab = self.table_cls([])
+        tab.allow_empty = True
+        self.assertEqual(''.join(tab.iter_html()), tab.__html__())
+
+    def test_overridden_tbody(self):
+        class MyTable(self.MyTable):
+            def tbody(self):
+                return '<tbody>custom</tbody>'
+
+        tab = MyTable(list(self.gen_nums(2)))
+        self.assertEqual(list(tab.iter_html()), [tab.__html__()])
+
+    def test_wrapped_html(self):
+        class MyTable(self.MyTable):
+            def __html__(self):
+                return '<div>{}</div>'.format(
+                    super(MyTable, self).__html__())
+
+        tab = MyTable(list(self.gen_nums(2)))
+        html = tab.__html__()
+        self.assertTrue(html.startswith('<div><table>'))
+        self.assertEqual(list(tab.iter_html()), [html])
+        out = []
+        tab.render_to(out)
+        self.assertEqual(out, [html])
+
+
+class RenderToTest(TableTest):
+
+    class MyTable(Table):
+        number = Col('Number')
+        name = Col('Name')
+
+    def items(self, n=10):
+        return [dict(number=i, name='<n{}>'.format(i)) for i in range(n)]
+
+    def render_to(self, table, **kwargs):
+        out = io.StringIO()
+        table.render_to(out, **kwargs)
+        return out.getvalue()
+
+    def test_same_as_html(self):
+        table = self.MyTable(self.items())
+        html = table.__html__()
+        self.assertEqual(self.render_to(table), html)
+        self.assertEqual(self.render_to(table, chunk_rows=3), html)
+        self.assertEqual(''.join(table.iter_html(chunk_rows=3)), html)
+        self.assertEqual(
+            html_reduce(self.render_to(
+                IterHtmlTest.MyTable(IterHtmlTest().gen_nums(10)))),
+            html_reduce(self.get_html('generator_test', 'test_ten')))
+
+    def test_list(self):
+        table = self.MyTable(self.items(5))
+        pieces = []
+        table.render_to(pieces, chunk_rows=2)
+        self.assertGreater(len(pieces), 3)
+        self.assertEqual(''.join(pieces), table.__html__())
+
+    def test_file(self):
+        table = self.MyTable(self.items())
+        with tempfile.TemporaryFile('w+') as f:
+            table.render_to(f)
+            f.seek(0)
+            self.assertEqual(f.read(), table.__html__())
+
+    def test_empty(self):
+        table = self.MyTable([])
+        self.assertEqual(self.render_to(table), '<p>No Items</p>')
+        table.allow_empty = True
+        self.assertEqual(self.render_to(table), table.__html__())
+        self.assertEqual(''.join(table.iter_html()), table.__html__())
+
+    def test_no_columns(self):
+        table = create_table()([1, 2])
+        self.assertEqual(self.render_to(table), ''.join(table.iter_html()))
+
+    def test_columnar(self):
+        table_cls = create_table().add_column('name', Col('Name'))
+        table = table_cls.from_columns(dict(name=['a', '<b>', 'c']))
+        self.assertEqual(self.render_to(table, chunk_rows=2),
+                         ''.join(table.iter_html()))
+
+    def test_overridden(self):
+        class TrTable(self.MyTable):
+            def get_tr_attrs(self, item):
+                return {'class': 'row'}
+
+        class TbodyTable(self.MyTable):
+            def tbody(self):
+                return '<tbody>custom</tbody>'
+
+        class CachedTable(self.MyTable):
+            row_cache_size = 10
+
+            def row_cache_key(self, item):
+                return item['number']
+
+        for table_cls in [TrTable, TbodyTable, CachedTable]:
+            table = table_cls(self.items())
+            self.assertEqual(self.render_to(table, chunk_rows=3),
+                             ''.join(table.iter_html()))
+
+    def test_pager(self):
+        class MyTable(self.MyTable):
+            def page_url(self, page):
+                return '?page={}'.format(page)
+
+        table = MyTable(iter(self.items()), per_page=3, page=2)
+        html = self.render_to(table)
+        self.assertIn('<ul class="pagination">', html)
+        self.assertEqual(
+            html, ''.join(MyTable(iter(self.items()), per_page=3,
+                                  page=2).iter_html()))
+
+    def test_instrument(self):
+        reported = []
+        table = self.MyTable(self.items(), instrument=True,
+                             stats_callback=reported.append)
+        html = self.render_to(table)
+        self.assertEqual(html, self.MyTable(self.items()).__html__())
+        self.assertEqual(len(reported), 1)
+        self.assertEqual(reported[0].rows, 10)
+        self.assertEqual(reported[0].bytes, len(html.encode('utf-8')))
+
+
+class ExportTest(FlaskTableTest):
+
+    class SubTable(Table):
+        x = Col('X')
+
+    class MyTable(Table):
+        name = Col('Name')
+        number = Col('Number')
+        flag = BoolCol('Flag')
+        day = DateCol('Day', date_format='yyyy-MM-dd')
+        opt = OptCol('Opt', choices={1: 'one'}, default_value='other')
+        view = LinkCol('View', 'view', attr='name',
+                       url_kwargs=dict(id_='number'))
+        delete = ButtonCol('Delete', 'delete', url_kwargs=dict(id_='number'))
+        hidden = Col('Hidden', show=False)
+
+    class MarkupCol(Col):
+        def td_format(self, content):
+            return Markup.escape(content.upper())
+
+    class ContentsCol(Col):
+        def td_contents(self, item, attr_list):
+            return Markup('<b>{}</b>').format(item['name'])
+
+    def items(self, n=3):
+        return [dict(name='a<b>, "{}"'.format(i), number=i, flag=i % 2,
+                     day=date(2020, 1, i + 1), opt=i, hidden='h')
+                for i in range(n)]
+
+    def test_csv(self):
+        csv = ''.join(self.MyTable(self.items()).iter_csv())
+        self.assertEqual(csv.splitlines(), [
+            'Name,Number,Flag,Day,Opt,View,Delete',
+            '"a<b>, ""0""",0,No,2020-01-01,other,"a<b>, ""0""",Delete',
+            '"a<b>, ""1""",1,Yes,2020-01-02,one,"a<b>, ""1""",Delete',
+            '"a<b>, ""2""",2,No,2020-01-03,other,"a<b>, ""2""",Delete',
+        ])
+
+    def test_csv_options(self):
+        table = self.MyTable(self.items(1))
+        csv = ''.join(table.iter_csv(header=False, delimiter=';'))
+        self.assertEqual(
+            csv, '"a<b>, ""0""";0;No;2020-01-01;other;"a<b>, ""0""";Delete'
+                 '\r\n')
+
+    def test_jsonl(self):
+        lines = ''.join(self.MyTable(self.items(2)).iter_jsonl())
+        rows = [json.loads(line) for line in lines.splitlines()]
+        self.assertEqual(rows[1], dict(
+            name='a<b>, "1"', number=1, flag='Yes', day='2020-01-02',
+            opt='one', view='a<b>, "1"', delete='Delete'))
+        pairs = json.loads(lines.splitlines()[0], object_pairs_hook=list)
+        self.assertEqual(
+            [key for key, _ in pairs],
+            ['name', 'number', 'flag', 'day', 'opt', 'view', 'delete'])
+
+    def test_chunks(self):
+        table = self.MyTable(iter(self.items(5)))
+        chunks = list(table.iter_csv(chunk_rows=2))
+        # The header, then three chunks of rows.
+        self.assertEqual([len(c.splitlines()) for c in chunks], [1, 2, 2, 1])
+        chunks = list(self.MyTable(self.items(5)).iter_jsonl(chunk_rows=2))
+        self.assertEqual([len(c.splitlines()) for c in chunks], [2, 2, 1])
+
+    def test_unescaped(self):
+        table_cls = create_table()
+        table_cls.add_column('name', self.MarkupCol('Name'))
+        table_cls.add_column('contents', self.ContentsCol('Contents'))
+        table_cls.add_column('raw', Col('Raw', attr='name', escape=False))
+        lines = ''.join(table_cls([dict(name='<a&b>')]).iter_csv())
+        self.assertEqual(lines.splitlines()[1],
+                         '<A&B>,<b><a&b></b>,<a&b>')
+
+    def test_nested_and_raw_values(self):
+        table_cls = create_table()
+        table_cls.add_column('sub', NestedTableCol('Sub', self.SubTable))
+        table_cls.add_column('day', Col('Day'))
+        table_cls.add_column('none', Col('None'))
+        items = [dict(sub=[dict(x=1), dict(x='<2>')], day=date(2020, 1, 2),
+                      none=None)]
+        row = json.loads(''.join(table_cls(items).iter_jsonl()))
+        self.assertEqual(row, dict(sub=[dict(x=1), dict(x='<2>')],
+                                   day='2020-01-02', none=''))
+        csv = ''.join(table_cls(items).iter_csv(header=False))
+        self.assertEqual(csv, '"[{""x"": 1}, {""x"": ""<2>""}]",2020-01-02,'
+                              '\r\n')
+
+    def test_export_format(self):
+        class CentsCol(Col):
+            def td_format(self, content):
+                return '${:.2f}'.format(content / 100.0)
+
+            def export_format(self, content):
+                return content
+
+        table_cls = create_table().add_column('price', CentsCol('Price'))
+        self.assert_in_html('$1.50', table_cls([dict(price=150)]))
+        self.assertEqual(''.join(table_cls([dict(price=150)]).iter_jsonl()),
+                         '{"price": 150}\n')
+
+    def test_sorted_and_limited(self):
+        table = self.MyTable(self.items(), sort_by='number',
+                             sort_reverse=True, sort_items=True, limit=2)
+        rows = [json.loads(line)['number']
+                for line in ''.join(table.iter_jsonl()).splitlines()]
+        self.assertEqual(rows, [2, 1])
+
+
+class IterHtmlResponseTest(FlaskTableTest):
+
+    class MyTable(Table):
+        number = Col('Number')
+
+    def test_stream(self):
+        tab = self.table_cls(({'number': i} for i in range(1, 11)))
+
+        @self.app.route('/stream')
+        def stream():
+            return Response(stream_with_context(tab.iter_html(chunk_rows=2)))
+
+        resp = self.client.get('/stream')
+        self.assertEqual(
+            html_reduce(resp.data.decode('utf-8')),
+            html_reduce(self.get_html('generator_test', 'test_ten')))
+
+
+class RowRendererTest(TableTest):
+
+    def test_cached_per_class(self):
+        class MyTable(Table):
+            name = Col('Name Heading')
+
+        items = [Item(name='one')]
+        MyTable(items).__html__()
+        renderer = MyTable._row_renderer
+        self.assert_html_equivalent_from_file(
+            'col_test', 'test_one', table=MyTable(items))
+        self.assertIs(MyTable._row_renderer, renderer)
+
+    def test_columns_changed(self):
+        table_cls = create_table().add_column('name', Col('Name Heading'))
+        items = [Item(name='one', hidden='Hidden')]
+        table_cls(items).__html__()
+        hidden = Col('Hidden')
+        table_cls.add_column('hidden', hidden)
+        self.assert_in_html('<td>Hidden</td>', table_cls(items))
+        hidden.show = False
+        self.assert_html_equivalent_from_file(
+            'col_test', 'test_one', table=table_cls(items))
+
+    def test_settings_changed(self):
+        class MyTable(Table):
+            a = Col('A')
+            b = ButtonCol('B', 'delete', url_kwargs=dict(id_='id'))
+
+        items = [dict(id=1, a='a', b='b')]
+        with test_app().test_request_context():
+            MyTable(items).__html__()
+            MyTable.a.attr_list = ['b']
+            MyTable.b.form_hidden_fields['x'] = 'y'
+            MyTable.b.button_attrs = {'class': 'btn'}
+            html = MyTable(items).__html__()
+        self.assert_in('<td>b</td>', html)
+        self.assert_in('<input name="x" type="hidden" value="y">', html)
+        self.assert_in('<button class="btn" type="submit">', html)
+
+    def test_overridden_td(self):
+        class MyCol(Col):
+            def td(self, item, attr):
+                return '<td>custom {}</td>'.format(item[attr])
+
+        class MyTable(Table):
+            name = MyCol('Name Heading')
+
+        self.assert_in_html(
+            '<td>custom one</td>', MyTable([dict(name='one')]))
+
+    def test_braces_in_attrs(self):
+        class MyTable(Table):
+            name = Col('Name Heading', td_html_attrs={'data-x': '{}'})
+
+        self.assert_in_html(
+            '<td data-x="{}">one</td>', MyTable([dict(name='one')]))
+
+
+class AttrDict(dict):
+    name = 'from attr'
+
+
+class AccessorTest(TableTest):
+
+    class MyTable(Table):
+        name = Col('Name Heading')
+
+    def test_dict_falls_back_to_attr(self):
+        self.assert_in_html('<td>from attr</td>', self.MyTable([AttrDict()]))
+
+    def test_dict_prefers_key(self):
+        self.assert_in_html(
+            '<td>from key</td>', self.MyTable([AttrDict(name='from key')]))
+
+    def test_mixed_item_types(self):
+        items = [Item(name='one'), dict(name='two'), FuncItem(name='three')]
+        html = self.MyTable(items).__html__()
+        for name in ['one', 'two', 'three']:
+            self.assert_in('<td>{}</td>'.format(name), html)
+
+    def test_missing_attr_errors(self):
+        with self.assertRaises(AttributeError):
+            self.MyTable([Item(other='one')]).__html__()
+
+    def test_callable_needing_args(self):
+        class ArgsItem(object):
+            def name(self, arg):
+                return arg
+
+        item = ArgsItem()
+        self.assert_in_html(
+            '<td>{}</td>'.format(Markup.escape(item.name)),
+            self.MyTable([item]))
+
+
+class FormattedAttrsTest(TableTest):
+
+    def test_element_formatted_attrs(self):
+        self.assertEqual(
+            element('td', formatted_attrs=' class="x"', content='<'),
+            '<td class="x">&lt;</td>')
+
+    def test_formatted_once(self):
+        col = Col('Name', td_html_attrs={'b': '2', 'a': '<'})
+        self.assertEqual(col.formatted_td_html_attrs, ' a="&lt;" b="2"')
+        self.assertIs(
+            col.formatted_td_html_attrs, col.formatted_td_html_attrs)
+        self.assertEqual(col.formatted_th_html_attrs, '')
+
+    def test_attrs_changed(self):
+        class MyTable(Table):
+            name = Col('Name Heading', column_html_attrs={'class': 'myclass'})
+
+        items = [Item(name='one')]
+        self.assert_html_equivalent_from_file(
+            'column_html_attrs_test', 'test_column_html_attrs', items,
+            table=MyTable(items))
+        MyTable.name.td_html_attrs = {'class': 'my-td-class'}
+        MyTable.name.th_html_attrs = {'class': 'my-th-class'}
+        self.assert_html_equivalent_from_file(
+            'column_html_attrs_test', 'test_both_html_attrs', items,
+            table=MyTable(items))
+
+    def test_attrs_changed_in_place(self):
+        class MyTable(Table):
+            name = Col('Name Heading', column_html_attrs={'class': 'myclass'})
+
+        items = [Item(name='one')]
+        self.assert_html_equivalent_from_file(
+            'column_html_attrs_test', 'test_column_html_attrs', items,
+            table=MyTable(items))
+        MyTable.name.td_html_attrs['class'] = 'my-td-class'
+        MyTable.name.th_html_attrs['class'] = 'my-th-class'
+        self.assert_html_equivalent_from_file(
+            'column_html_attrs_test', 'test_both_html_attrs', items,
+            table=MyTable(items))
+
+
+class TheadCacheTest(FlaskTableTest):
+
+    class MyTable(Table):
+        allow_sort = True
+        thead_cache_size = 2
+        name = Col('Name')
+
+        sort_url_calls = 0
+
+        def sort_url(self, col_key, reverse=False):
+            type(self).sort_url_calls += 1
+            kwargs = {'sort': col_key}
+            if reverse:
+                kwargs['direction'] = 'desc'
+            return url_for('index', **kwargs)
+
+    def setUp(self):
+        self.MyTable.sort_url_calls = 0
+        if '_thead_cache' in self.MyTable.__dict__:
+            self.MyTable._thead_cache.clear()
+
+    def test_cached(self):
+        items = [Item(name='name')]
+        for _ in range(3):
+            self.assert_html_equivalent_from_file(
+                'sorting_test', 'test_sorted', table=self.MyTable(
+                    items, sort_by='name'))
+        self.assertEqual(self.MyTable.sort_url_calls, 1)
+        self.assertEqual(self.MyTable._thead_cache.hits, 2)
+
+    def test_sort_state_in_key(self):
+        items = [Item(name='name')]
+        self.assert_html_equivalent_from_file(
+            'sorting_test', 'test_sorted', table=self.MyTable(
+                items, sort_by='name'))
+        self.assert_html_equivalent_from_file(
+            'sorting_test', 'test_sorted_reverse', table=self.MyTable(
+                items, sort_by='name', sort_reverse=True))
+        self.assert_html_equivalent_from_file(
+            'sorting_test', 'test_start', table=self.MyTable(items))
+        self.assertEqual(self.MyTable.sort_url_calls, 3)
+        # Bounded to thead_cache_size.
+        self.assertEqual(len(self.MyTable._thead_cache), 2)
+
+    def test_key_none(self):
+        class MyTable(self.MyTable):
+            def thead_cache_key(self):
+                return None
+
+        items = [Item(name='name')]
+        MyTable(items).__html__()
+        MyTable(items).__html__()
+        self.assertEqual(MyTable.sort_url_calls, 2)
+        self.assertNotIn('_thead_cache', MyTable.__dict__)
+
+
+class RowCacheTest(TableTest):
+
+    class CountingCol(Col):
+        calls = 0
+
+        def td_format(self, content):
+            type(self).calls += 1
+            return super(RowCacheTest.CountingCol, self).td_format(content)
+
+    def make_table_cls(self, **attrs):
+        class MyTable(Table):
+            row_cache_size = 10
+            name = self.CountingCol('Name')
+            other = Col('Other', show=False)
+
+            def row_cache_key(self, item):
+                return item['id'], item['version']
+
+        for name, value in attrs.items():
+            setattr(MyTable, name, value)
+        self.CountingCol.calls = 0
+        return MyTable
+
+    def items(self, version=1):
+        return [dict(id=i, version=version, name='n{}'.format(i), other=i)
+                for i in range(3)]
+
+    def test_cached(self):
+        MyTable = self.make_table_cls()
+        html = MyTable(self.items()).__html__()
+        self.assertEqual(MyTable(self.items()).__html__(), html)
+        self.assertEqual(self.CountingCol.calls, 3)
+        cache = MyTable.get_row_cache()
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+    def test_only_misses_rendered(self):
+        MyTable = self.make_table_cls()
+        MyTable(self.items()[:2]).__html__()
+        html = MyTable(self.items()).__html__()
+        self.assertEqual(self.CountingCol.calls, 3)
+        self.assertEqual(html, self.make_table_cls(row_cache_size=0)(
+            self.items()).__html__())
+
+    def test_key_changes(self):
+        MyTable = self.make_table_cls()
+        MyTable(self.items()).__html__()
+        MyTable(self.items(version=2)).__html__()
+        self.assertEqual(self.CountingCol.calls, 6)
+
+    def test_visible_columns_in_key(self):
+        MyTable = self.make_table_cls()
+        MyTable(self.items()).__html__()
+        MyTable.other.show = True
+        try:
+            html = MyTable(self.items()).__html__()
+        finally:
+            MyTable.other.show = False
+        self.assert_in('<td>n0</td><td>0</td>', html)
+        self.assertEqual(self.CountingCol.calls, 6)
+
+    def test_invalidate(self):
+        MyTable = self.make_table_cls()
+        MyTable(self.items()).__html__()
+        MyTable.invalidate_row((1, 1))
+        MyTable(self.items()).__html__()
+        self.assertEqual(self.CountingCol.calls, 4)
+        MyTable.clear_row_cache()
+        MyTable(self.items()).__html__()
+        self.assertEqual(self.CountingCol.calls, 7)
+
+    def test_bounded(self):
+        MyTable = self.make_table_cls(row_cache_size=2)
+        MyTable(self.items()).__html__()
+        self.assertEqual(len(MyTable.get_row_cache()), 2)
+
+    def test_backend(self):
+        cache = LRUCache(100)
+        MyTable = self.make_table_cls(row_cache=cache, row_cache_size=0)
+        MyTable(self.items()).__html__()
+        self.assertEqual(len(cache), 3)
+
+    def test_shared_backend_created_tables(self):
+        # Tables made by create_table all have the same name, so their
+        # columns need to tell them apart.
+        cache = LRUCache(100)
+
+        def make(col):
+            table_cls = create_table(options=dict(
+                row_cache=cache, row_cache_key=lambda self, item: item['id']))
+            return table_cls.add_column('a', col)
+
+        items = [dict(id=1, a=1)]
+        self.assert_in_html('<td>1</td>', make(Col('A'))(items))
+        self.assert_in_html('<td>Yes</td>', make(BoolCol('A'))(items))
+        self.assertEqual(len(cache), 2)
+
+        with_col = make(Col('A'))(items)
+        with_bool = make(BoolCol('A'))(items)
+        self.assertNotEqual(with_col.etag_key(), with_bool.etag_key())
+
+    def test_key_none_not_cached(self):
+        MyTable = self.make_table_cls(row_cache_key=lambda self, item: None)
+        MyTable(self.items()).__html__()
+        MyTable(self.items()).__html__()
+        self.assertEqual(self.CountingCol.calls, 6)
+        self.assertEqual(len(MyTable.get_row_cache()), 0)
+
+    def test_off_by_default(self):
+        class MyTable(Table):
+            name = Col('Name')
+
+        MyTable(self.items()).__html__()
+        self.assertIsNone(MyTable.get_row_cache())
+
+
+class MakeResponseTest(FlaskTableTest):
+
+    class MyTable(Table):
+        html_cache_size = 2
+        name = Col('Name')
+
+        renders = 0
+
+        def row_cache_key(self, item):
+            return item['id'], item['version']
+
+        def tbody(self):
+            type(self).renders += 1
+            return super(MakeResponseTest.MyTable, self).tbody()
+
+    items = [dict(id=1, version=1, name='a'), dict(id=2, version=1, name='b')]
+
+    def setUp(self):
+        self.MyTable.renders = 0
+        if '_html_cache' in self.MyTable.__dict__:
+            self.MyTable._html_cache.clear()
+
+    def get(self, items, headers=None, **kwargs):
+        with self.app.test_request_context('/', headers=headers):
+            return self.MyTable(items, **kwargs).make_response()
+
+    def test_etag(self):
+        response = self.get(self.items)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(as_text=True),
+                         self.MyTable(self.items).__html__())
+        etag = response.get_etag()[0]
+        self.assertTrue(etag)
+        self.assertEqual(self.get(self.items).get_etag()[0], etag)
+
+    def test_not_modified(self):
+        etag = self.get(self.items).get_etag()[0]
+        response = self.get(
+            self.items, headers={'If-None-Match': '"{}"'.format(etag)})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        self.assertEqual(self.MyTable.renders, 1)
+
+    def test_cached(self):
+        self.get(self.items)
+        response = self.get(self.items)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.MyTable.renders, 1)
+
+    def test_etag_changes(self):
+        etag = self.get(self.items).get_etag()[0]
+        items = [dict(item, version=2) for item in self.items]
+        self.assertNotEqual(self.get(items).get_etag()[0], etag)
+        self.assertNotEqual(
+            self.get(self.items, no_items='None').get_etag()[0], etag)
+        self.assertNotEqual(
+            self.get(list(reversed(self.items))).get_etag()[0], etag)
+
+    def test_generator(self):
+        response = self.get(item for item in self.items)
+        self.assertEqual(response.get_data(as_text=True),
+                         self.MyTable(self.items).__html__())
+
+    def test_no_etag(self):
+        class MyTable(Table):
+            name = Col('Name')
+
+        with self.app.test_request_context('/'):
+            response = MyTable(self.items).make_response()
+        self.assertEqual(response.get_etag(), (None, None))
+        self.assertEqual(response.get_data(as_text=True),
+                         MyTable(self.items).__html__())
+
+
+class PidCol(Col):
+    """Shows the id of the process that rendered the cell."""
+
+    def td_format(self, content):
+        return str(os.getpid())
+
+
+@unittest.skipIf(sys.version_info < (3, 7),
+                 'Needs ProcessPoolExecutor with an initializer')
+class ProcessesTest(FlaskTableTest):
+
+    class MyTable(Table):
+        chunk_rows = 3
+        name = Col('Name')
+        na = BoolNaCol('NA')
+        date = DateCol('Date', date_format='long')
+
+    items = [dict(name='n<{}>'.format(i), na=[None, True, 0][i % 3],
+                  date=date(2020, 1, i + 1)) for i in range(10)]
+
+    def test_same_as_serial(self):
+        self.assertEqual(self.MyTable(self.items, processes=2).__html__(),
+                         self.MyTable(self.items).__html__())
+        self.assertEqual(
+            ''.join(self.MyTable(iter(self.items), processes=2).iter_html()),
+            self.MyTable(self.items).__html__())
+
+    def test_rendered_in_other_processes(self):
+        class MyTable(Table):
+            chunk_rows = 2
+            pid = PidCol('Pid', attr='name')
+
+        html = MyTable(self.items, processes=2).__html__()
+        self.assert_not_in('<td>{}</td>'.format(os.getpid()), html)
+
+    def test_one_chunk_rendered_here(self):
+        class MyTable(Table):
+            chunk_rows = 20
+            pid = PidCol('Pid', attr='name')
+
+        html = MyTable(self.items, processes=2).__html__()
+        self.assert_in('<td>{}</td>'.format(os.getpid()), html)
+
+    def test_lazy_strings_translated(self):
+        # Only translate in this process, as gettext can only translate
+        # for the request here.
+        pid = os.getpid()
+        gettext = flask_table.i18n.gettext
+        flask_table.i18n.gettext = lambda string: (
+            'fr ' + string if os.getpid() == pid else string)
+        try:
+            html = self.MyTable(self.items, processes=2).__html__()
+        finally:
+            flask_table.i18n.gettext = gettext
+        self.assertEqual(html.count('<td>fr N/A</td>'), 4)
+        self.assertEqual(html.count('<td>fr Yes</td>'), 3)
+        self.assertEqual(html.count('<td>fr No</td>'), 3)
+
+    def test_create_table(self):
+        MyTable = create_table('MyTable', options={'chunk_rows': 2})
+        MyTable.add_column('name', Col('Name'))
+        MyTable.add_column('pid', PidCol('Pid', attr='name'))
+        html = MyTable(self.items, processes=2).__html__()
+        self.assert_in('<td>n&lt;9&gt;</td>', html)
+        self.assert_not_in('<td>{}</td>'.format(os.getpid()), html)
+
+    def test_unpicklable_items(self):
+        items = [dict(item, extra=lambda: None) for item in self.items]
+        self.assertEqual(self.MyTable(items, processes=2).__html__(),
+                         self.MyTable(self.items).__html__())
+
+    def test_needs_request_context(self):
+        class MyTable(Table):
+            chunk_rows = 2
+            view = LinkCol('View', 'view', url_kwargs=dict(id_='id'))
+
+        items = [dict(id=i) for i in range(5)]
+        self.assertEqual(MyTable(items, processes=2).__html__(),
+                         MyTable(items).__html__())
+
+    def test_row_cache(self):
+        class MyTable(self.MyTable):
+            row_cache_size = 20
+
+            def row_cache_key(self, item):
+                return item['name']
+
+        html = MyTable(self.items[:4]).__html__()
+        self.assertEqual(MyTable(self.items[:4], processes=2).__html__(),
+                         html)
+        self.assertEqual(MyTable(self.items, processes=2).__html__(),
+                         self.MyTable(self.items).__html__())
+        self.assertEqual(len(MyTable.get_row_cache()), 10)
+
+
+class SlowCol(Col):
+    """Takes a while to render each cell, as if it were looking
+    something up.
+
+    """
+    delay = 0.05
+
+    def td_contents(self, item, attr_list):
+        time.sleep(self.delay)
+        if item['name'] == 'fail':
+            raise ValueError('Lookup failed')
+        return 'looked up {}'.format(item['name'])
+
+
+@unittest.skipIf(futures is None, 'concurrent.futures is not installed')
+class ConcurrentColTest(FlaskTableTest):
+
+    class MyTable(Table):
+        name = Col('Name')
+        slow = SlowCol('Slow', concurrent=True)
+        view = LinkCol('View', 'by_name', url_kwargs=dict(name='name'),
+                       concurrent=True)
+
+    class SerialTable(Table):
+        name = Col('Name')
+        slow = SlowCol('Slow')
+        view = LinkCol('View', 'by_name', url_kwargs=dict(name='name'))
+
+    items = [dict(name='n{}'.format(i)) for i in range(10)]
+
+    def test_same_as_serial(self):
+        start = time.time()
+        html = self.MyTable(self.items).__html__()
+        elapsed = time.time() - start
+        self.assertEqual(html, self.SerialTable(self.items).__html__())
+        self.assert_in('<td>looked up n9</td>', html)
+        self.assertLess(elapsed, SlowCol.delay * len(self.items) / 2)
+
+    def test_chunks(self):
+        class MyTable(self.MyTable):
+            chunk_rows = 3
+
+        self.assertEqual(
+            ''.join(MyTable(self.items).iter_html()),
+            self.SerialTable(self.items).__html__())
+
+    def test_error(self):
+        items = self.items + [dict(name='fail')]
+        with self.assertRaises(ValueError):
+            self.MyTable(items).__html__()
+
+    def test_timeout(self):
+        class MyTable(self.MyTable):
+            concurrent_workers = 2
+            concurrent_timeout = 0.1
+
+        with self.assertRaises(futures.TimeoutError):
+            MyTable(self.items).__html__()
+
+    def test_nested_table(self):
+        class SubTable(Table):
+            b = Col('b')
+
+        class MyTable(Table):
+            a = Col('a')
+            nest = NestedTableCol('Nested', SubTable, concurrent=True)
+
+        class SerialTable(Table):
+            a = Col('a')
+            nest = NestedTableCol('Nested', SubTable)
+
+        items = [dict(a=i, nest=[dict(b=j) for j in range(i)])
+                 for i in range(5)]
+        self.assertEqual(MyTable(items).__html__(),
+                         SerialTable(items).__html__())
+
+
+class PickleTableTest(TableTest):
+
+    def test_importable(self):
+        self.assertIs(pickle.loads(pickle.dumps(ProcessesTest.MyTable)),
+                      ProcessesTest.MyTable)
+
+    def test_rebuilt(self):
+        MyTable = create_table('MyTable', options={'classes': ['c']})
+        MyTable.add_column('name', Col('Name'))
+        MyTable.add_column('na', BoolNaCol('NA'))
+        rebuilt = pickle.loads(pickle.dumps(MyTable))
+        self.assertIsNot(rebuilt, MyTable)
+        self.assertEqual(list(rebuilt._cols), ['name', 'na'])
+        items = [dict(name='a', na=None)]
+        self.assertEqual(rebuilt(items).__html__(), MyTable(items).__html__())
+
+
+class SlotsTest(TableTest):
+
+    class ExtraCol(Col):
+        def __init__(self, name, extra, **kwargs):
+            super(SlotsTest.ExtraCol, self).__init__(name, **kwargs)
+            self.extra = extra
+
+    def make_cols(self):
+        return [
+            Col('Col', td_html_attrs={'class': 'c'}),
+            OptCol('Opt', choices={1: 'one'}, coerce_fn=int),
+            BoolCol('Bool'),
+            BoolNaCol('BoolNa'),
+            DateCol('Date', date_format='long', format_cache_size=2),
+            DatetimeCol('Datetime'),
+            LinkCol('Link', 'view', url_kwargs=dict(id='id')),
+            ButtonCol('Button', 'delete', button_attrs={'class': 'b'}),
+            NestedTableCol('Nested', create_table()),
+        ]
+
+    def test_no_dict(self):
+        for col in self.make_cols():
+            self.assertFalse(hasattr(col, '__dict__'), type(col))
+            with self.assertRaises(AttributeError):
+                col.not_a_slot = 1
+
+    def test_subclass_attributes(self):
+        col = self.ExtraCol('Extra', extra=1)
+        col.more = 2
+        self.assertEqual((col.extra, col.more), (1, 2))
+
+    def test_pickle(self):
+        for col in self.make_cols() + [self.ExtraCol('Extra', extra=1)]:
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                loaded = pickle.loads(pickle.dumps(col, protocol))
+                self.assertIs(type(loaded), type(col))
+                self.assertEqual(sorted(loaded.__getstate__()),
+                                 sorted(col.__getstate__()))
+                self.assertEqual(loaded.name, col.name)
+        loaded = pickle.loads(pickle.dumps(self.ExtraCol('E', extra=1), 0))
+        self.assertEqual(loaded.extra, 1)
+        self.assertEqual(loaded.formatted_td_html_attrs, '')
+
+
+class LazyImportTest(unittest.TestCase):
+    """Importing flask_table shouldn't import Flask or Babel, which are
+    only needed once something is rendered.
+
+    """
+
+    heavy_modules = ['flask', 'flask_babel', 'babel', 'babel.dates',
+                     'werkzeug', 'jinja2']
+
+    @unittest.skipIf(sys.version_info < (3, 7),
+                     '-X importtime needs Python 3.7 or later')
+    def test_importtime(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        process = subprocess.Popen(
+            [sys.executable, '-X', 'importtime', '-c', 'import flask_table'],
+            cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        _, stderr = process.communicate()
+        self.assertEqual(process.returncode, 0, stderr)
+        imported = set(
+            line.split('|')[-1].strip()
+            for line in stderr.decode('utf-8').splitlines()
+            if line.startswith('import time:'))
+        self.assertIn('flask_table.columns', imported)
+        for module in self.heavy_modules:
+            self.assertNotIn(module, imported)
+
+
+class LazyGettextTest(TableTest):
+
+    def setUp(self):
+        self.gettext = flask_table.i18n.gettext
+        flask_table.i18n.gettext = lambda string: string.upper()
+
+    def tearDown(self):
+        flask_table.i18n.gettext = self.gettext
+
+    def test_translated_when_used(self):
+        yes = BoolCol.yes_display
+        self.assertEqual(yes, 'YES')
+        self.assertEqual('{}!'.format(yes), 'YES!')
+        self.assertEqual(yes + '!', 'YES!')
+        self.assertEqual(len(yes), 3)
+        flask_table.i18n.gettext = self.gettext
+        self.assertEqual(yes, 'Yes')
+
+    def test_render(self):
+        MyTable = create_table().add_column('b', BoolNaCol('B'))
+        self.assert_in_html('<td>N/A</td>', MyTable([dict(b=None)]))
+        self.assert_in_html('<td>YES</td>', MyTable([dict(b=True)]))
+        self.assertEqual(MyTable([]).__html__(), '<p>NO ITEMS</p>')
+
+    def test_translated_once_per_chunk(self):
+        contents = BoolNaCol('B').td_format_many([True, False, None])
+        self.assertEqual(contents, ['YES', 'NO', 'N/A'])
+        self.assertEqual([type(c) for c in contents], [type('')] * 3)
+        self.assertIs(type(BoolCol('B').td_format(1)), type(''))
+
+
+class BenchTest(unittest.TestCase):
+
+    def test_run(self):
+        results = bench.run(rows=[3], columns=['Col', 'LinkCol'], repeat=1,
+                            tables=5)
+        json.dumps(results)
+        self.assertEqual(len(results['results']), 8)
+        result = results['results'][0]
+        self.assertEqual(
+            (result['column'], result['row_type'], result['attr'],
+             result['rows']),
+            ('Col', 'dict', 'value', 3))
+        self.assertGreater(result['rows_per_sec'], 0)
+        self.assertEqual(
+            [(r['column'], r['tables']) for r in results['build_results']],
+            [('Col', 5), ('LinkCol', 5)])
+        self.assertGreater(results['build_results'][0]['tables_per_sec'], 0)
+
+    def test_items(self):
+        for row_type in bench.ROW_TYPES:
+            items = bench.make_items(row_type, 'a.b.value', 2, str)
+            self.assertEqual(
+                [flask_table.columns._recursive_getattr(item, 'a.b.value')
+                 for item in items],
+                ['0', '1'])
+
+    def test_main(self):
+        output = io.StringIO()
+        with tempfile.NamedTemporaryFile('w+') as f:
+            json.dump(bench.run(rows=[2], columns=['Col'], repeat=1,
+                                tables=2), f)
+            f.flush()
+            stderr = sys.stderr
+            sys.stderr = output
+            try:
+                bench.main(['--rows', '2', '--columns', 'BoolCol,Col',
+                            '--row-types', 'object', '--attrs', 'value',
+                            '--repeat', '1', '--tables', '2',
+                            '--output', f.name,
+                            '--compare', f.name])
+            finally:
+                sys.stderr = stderr
+            f.seek(0)
+            results = json.load(f)['results']
+        self.assertEqual([r['column'] for r in results], ['Col', 'BoolCol'])
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        # Col was in the earlier results, but BoolCol wasn't.
+        self.assertIn('%', lines[0])
+        self.assertNotIn('%', lines[1])
+        self.assertIn('%', lines[2])
+        self.assertNotIn('%', lines[3])
+
+
+class InstrumentTest(TableTest):
+
+    class MyTable(Table):
+        name = Col('Name')
+        flag = BoolCol('Flag')
+        nested = Col('Nested', attr='a.b')
+        upper = Col('Upper', escape=False)
+
+    class ContentsCol(Col):
+        def td_contents(self, item, attr_list):
+            return 'x'
+
+    def items(self, n=3):
+        return [dict(name='<n{}>'.format(i), flag=i % 2 == 0, a=dict(b=i),
+                     upper='U', other=i) for i in range(n)]
+
+    def test_same_html(self):
+        items = self.items()
+        html = self.MyTable(items).__html__()
+        table = self.MyTable(items, instrument=True)
+        self.assertEqual(table.__html__(), html)
+        self.assertEqual(''.join(table.iter_html(chunk_rows=2)), html)
+
+    def test_stats(self):
+        reported = []
+        table = self.MyTable(self.items(), instrument=True,
+                             stats_callback=reported.append)
+        html = table.__html__()
+        self.assertEqual(reported, [table.stats])
+        stats = table.stats
+        self.assertEqual(stats.rows, 3)
+        self.assertEqual(stats.bytes, len(html.encode('utf-8')))
+        self.assertGreater(stats.seconds, 0)
+        self.assertEqual(list(stats.columns), ['name', 'flag', 'nested',
+                                               'upper'])
+        self.assertEqual(list(stats.columns['name']),
+                         ['access', 'escape', 'element'])
+        self.assertEqual(list(stats.columns['flag']),
+                         ['access', 'format', 'element'])
+        self.assertEqual(list(stats.columns['upper']),
+                         ['access', 'format', 'element'])
+        self.assertEqual(stats.columns['nested']['access'].calls, 3)
+        json.dumps(stats.as_dict())
+
+    def test_td_phase(self):
+        table_cls = create_table().add_column('x', self.ContentsCol('X'))
+        table = table_cls(self.items(), instrument=True)
+        table.__html__()
+        self.assertEqual(list(table.stats.columns['x']), ['td'])
+        self.assertEqual(table.stats.columns['x']['td'].calls, 3)
+
+    def test_iter_html_stats(self):
+        reported = []
+        table = self.MyTable(self.items(5), instrument=True,
+                             stats_callback=reported.append)
+        pieces = table.iter_html(chunk_rows=2)
+        self.assertEqual(reported, [])
+        html = ''.join(pieces)
+        self.assertEqual(len(reported), 1)
+        self.assertEqual(reported[0].rows, 5)
+        self.assertEqual(reported[0].bytes, len(html.encode('utf-8')))
+        self.assertEqual(reported[0].columns['name']['access'].calls, 5)
+
+    def test_not_instrumented(self):
+        table = self.MyTable(self.items())
+        table.__html__()
+        self.assertIsNone(table.stats)
+
+    def test_report_stats(self):
+        reported = []
+
+        class MyTable(self.MyTable):
+            instrument = True
+
+            def report_stats(self, stats):
+                reported.append(stats.rows)
+
+        ''.join(MyTable(self.items(), limit=2).iter_html())
+        self.assertEqual(reported, [2])
+
+    def test_columnar(self):
+        table_cls = create_table().add_column('name', Col('Name'))
+        columns = dict(name=['a', '<b>'])
+        table = table_cls.from_columns(columns, instrument=True)
+        self.assertEqual(table.__html__(),
+                         table_cls.from_columns(columns).__html__())
+        self.assertEqual(table.stats.rows, 2)
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_delete_and_clear(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.delete('a')
+        self.assertEqual(len(cache), 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class ColumnarTest(TableTest):
+
+    class MyTable(Table):
+        name = Col('Name Heading')
+
+    def test_one(self):
+        self.assert_html_equivalent_from_file(
+            'col_test', 'test_one',
+            table=self.MyTable.from_columns({'name': ['one']}))
+
+    def test_ten(self):
+        columns = {'name': [str(i) for i in range(10)], 'unused': [0] * 10}
+        self.assert_html_equivalent_from_file(
+            'col_test', 'test_ten', table=self.MyTable.from_columns(columns))
+
+    def test_chunks(self):
+        columns = {'name': [str(i) for i in range(10)]}
+        tab = self.MyTable.from_columns(columns)
+        self.assertEqual(
+            ''.join(tab.iter_html(chunk_rows=3)),
+            self.MyTable([dict(name=n) for n in columns['name']]).__html__())
+
+    def test_empty(self):
+        self.assert_html_equivalent_from_file(
+            'empty_test', 'test_none',
+            table=self.MyTable.from_columns({'name': []}))
+
+    def test_attr_list(self):
+        class MyTable(Table):
+            name = Col('Subitem Name Heading', attr='subitem.name')
+
+        tab = MyTable.from_columns(
+            {'subitem': (Subitem(name='one'), None)})
+        self.assert_html_equivalent_from_file(
+            'attr_list_test', 'test_two_one_empty', table=tab)
+
+    def test_opt(self):
+        class MyTable(Table):
+            choice = OptCol(
+                'Choice Heading',
+                choices={'a': 'A', 'b': 'Bbb', 'c': 'Ccccc'})
+
+        tab = MyTable.from_columns({'choice': ['a', 'b', 'c', 'd']})
+        self.assert_html_equivalent_from_file(
+            'opt_test', 'test_one', table=tab)
+
+    def test_overridden_tr_attrs(self):
+        class MyTable(OverrideTrTest.MyTable):
+            pass
+
+        tab = MyTable.from_columns({'number': range(10)})
+        self.assert_html_equivalent_from_file(
+            'override_tr_test', 'test_ten', table=tab)
+
+    def test_iter_rows(self):
+        items = ColumnarItems({'a': [1, 2], 'b': 'xy'})
+        self.assertEqual(len(items), 2)
+        self.assertEqual(
+            list(items), [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'y'}])
+
+
+class ColumnarLinkTest(FlaskTableTest):
+
+    class MyTable(Table):
+        name = Col('Name')
+        view = LinkCol('View', 'view', url_kwargs=dict(id_='id'))
+
+    def test_one(self):
+        tab = self.MyTable.from_columns({'name': ['one'], 'id': [1]})
+        self.assert_html_equivalent_from_file(
+            'link_test', 'test_one', table=tab)
+
+
+class TdFormatManyTest(TableTest):
+
+    def test_used_by_table(self):
+        class UpperCol(Col):
+            calls = []
+
+            def td_format_many(self, values):
+                self.calls.append(len(values))
+                return [v.upper() for v in values]
+
+        class MyTable(Table):
+            name = UpperCol('Name Heading')
+
+        tab = MyTable([Item(name=str(i)) for i in range(10)] +
+                      [Item(name='ten')])
+        self.assertEqual(
+            ''.join(tab.iter_html(chunk_rows=4)).count('<td>TEN</td>'), 1)
+        self.assertEqual(UpperCol.calls, [4, 4, 3])
+
+    def test_default(self):
+        col = Col('Name')
+        self.assertEqual(col.td_format_many(['<', 1]), ['&lt;', '1'])
+
+    def test_opt(self):
+        col = BoolNaCol('YesNoNa')
+        values = [True, 'Truthy', '', None]
+        self.assertEqual(
+            col.td_format_many(values), [col.td_format(v) for v in values])
+
+    def test_opt_overridden_td_format(self):
+        class MyCol(OptCol):
+            def td_format(self, content):
+                return 'custom'
+
+        self.assertEqual(MyCol('Opt').td_format_many(['a']), ['custom'])
+
+    def test_date(self):
+        col = DateCol('Date')
+        values = [date(2014, 1, 1), None, date(2014, 1, 1), None]
+        self.assertEqual(
+            col.td_format_many(values), [col.td_format(v) for v in values])
+
+    def test_map_distinct(self):
+        calls = []
+
+        def fn(value):
+            calls.append(value)
+            return str(value)
+
+        self.assertEqual(
+            _map_distinct(fn, [1, 2, 1, [3], 2]),
+            ['1', '2', '1', '[3]', '2'])
+        self.assertEqual(calls, [1, 2, [3]])
+
+    @unittest.skipIf(timezone is None, 'needs datetime.timezone')
+    def test_timezones(self):
+        # Equal, but formatted in their own timezones.
+        est = timezone(-timedelta(hours=5))
+        values = [datetime(2020, 1, 1, 12, tzinfo=timezone.utc),
+                  datetime(2020, 1, 1, 7, tzinfo=est)]
+        self.assertEqual(values[0], values[1])
+        col = DatetimeCol('Datetime', datetime_format='yyyy-MM-dd HH:mm ZZZZ')
+        self.assertEqual(
+            col.td_format_many(values), [col.td_format(v) for v in values])
+        self.assertEqual(col.td_format_many(values), [
+            '2020-01-01 12:00 GMT+00:00', '2020-01-01 07:00 GMT-05:00'])
+
+    @unittest.skipIf(timezone is None, 'needs datetime.timezone')
+    def test_timezones_cached(self):
+        utc = datetime(2020, 1, 1, 12, tzinfo=timezone.utc)
+        est = datetime(2020, 1, 1, 7, tzinfo=timezone(-timedelta(hours=5)))
+        col = DatetimeCol('Datetime', datetime_format='HH:mm ZZZZ',
+                          format_cache_size=10)
+        # In separate renders, so the second could only come from the
+        # cache.
+        self.assertEqual(col.td_format_many([utc]), ['12:00 GMT+00:00'])
+        self.assertEqual(col.td_format_many([est]), ['07:00 GMT-05:00'])
+
+
+class EscapeManyTest(unittest.TestCase):
+
+    def test_same_as_markup_escape(self):
+        values = ['plain', '<&"\'>', 1, -2, 1.5, Decimal('1.10'), True,
+                  None, Markup('<b>safe</b>'), Item(), date(2014, 1, 1)]
+        self.assertEqual(
+            escape_many(values), [Markup.escape(v) for v in values])
+
+    def test_plain_strings(self):
+        for value in escape_many(['a', '<', 1, 1.5]):
+            self.assertIs(type(value), type(''))
+
+
+class EscapeFalseTest(TableTest):
+
+    class MyTable(Table):
+        name = Col('Name', escape=False)
+
+    def test_not_escaped(self):
+        items = [Item(name='<b>bold</b>')]
+        self.assert_in_html('<td><b>bold</b></td>', self.MyTable(items))
+        self.assertEqual(
+            self.MyTable.name.td_format('<b>bold</b>'), '<b>bold</b>')
+        self.assertEqual(
+            self.MyTable.name.td_format_many(['<b>bold</b>']),
+            ['<b>bold</b>'])
+
+
+class DateLocaleTest(unittest.TestCase):
+
+    class MyTable(Table):
+        date = DateCol('Date Heading', format_cache_size=10)
+        datetime = DatetimeCol('DateTime Heading')
+
+    items = [Item(date=date(2014, 1, 2),
+                  datetime=datetime(2014, 1, 2, 10, 20, 30))] * 3
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        babel = Babel(self.app)
+        self.locale = 'en_GB'
+
+        @babel.localeselector
+        def get_locale():
+            return self.locale
+
+    def assert_formatted(self, locale):
+        with self.app.test_request_context():
+            html = self.MyTable(self.items).__html__()
+        expected_date = format_date(date(2014, 1, 2), 'short', locale=locale)
+        expected_datetime = format_datetime(
+            datetime(2014, 1, 2, 10, 20, 30), 'short', locale=locale)
+        self.assertEqual(
+            html.count('<td>{}</td><td>{}</td>'.format(
+                expected_date, expected_datetime)),
+            3)
+
+    def test_switch_locale(self):
+        self.assert_formatted('en_GB')
+        self.locale = 'de_DE'
+        self.assert_formatted('de_DE')
+        self.locale = 'en_GB'
+        self.assert_formatted('en_GB')
+
+    def test_format_cache(self):
+        cache = self.MyTable.date.format_cache
+        cache.clear()
+        self.assert_formatted('en_GB')
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        self.assert_formatted('en_GB')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.locale = 'de_DE'
+        self.assert_formatted('de_DE')
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+
+class LinkUrlTemplateTest(FlaskTableTest):
+
+    class MyTable(Table):
+        view = LinkCol('View', 'view', url_kwargs=dict(id_='id'))
+        by_name = LinkCol('Name', 'by_name', url_kwargs=dict(name='name'))
+        delete = ButtonCol('Delete', 'delete', url_kwargs=dict(id_='id'))
+
+    def setUp(self):
+        self.url_for_calls = []
+        url_for = flask_table.urls.url_for
+
+        def counting_url_for(endpoint, **kwargs):
+            self.url_for_calls.append(endpoint)
+            return url_for(endpoint, **kwargs)
+
+        flask_table.urls.url_for = counting_url_for
+
+    def tearDown(self):
+        flask_table.urls.url_for = url_for
+
+    def assert_urls(self, items):
+        html = self.MyTable(items).__html__()
+        for item in items:
+            self.assert_in(
+                '<a href="{}">View</a>'.format(url_for('view', id_=item.id)),
+                html)
+            self.assert_in(
+                '<a href="{}">Name</a>'.format(
+                    Markup.escape(url_for('by_name', name=item.name))),
+                html)
+            self.assert_in(
+                'action="{}"'.format(url_for('delete', id_=item.id)), html)
+
+    def test_template(self):
+        items = [Item(id=i, name='name {}'.format(i)) for i in range(20)]
+        self.assert_urls(items)
+        # Just once for each column, to check the template.
+        self.assertEqual(
+            sorted(self.url_for_calls), ['by_name', 'delete', 'view'])
+
+    def test_quoting(self):
+        items = [Item(id=1, name='a b/c?d&e'), Item(id=2, name='äöüß'),
+                 Item(id=3, name='<"\'>')]
+        self.assert_urls(items)
+        self.assertEqual(len(self.url_for_calls), 3)
+
+    def test_script_root(self):
+        items = [Item(id=i, name=str(i)) for i in range(3)]
+        with self.app.test_request_context(
+                '/', base_url='http://localhost/prefix'):
+            self.assert_urls(items)
+            self.assert_in_html(
+                '<a href="/prefix/view/2">View</a>', self.MyTable(items))
+
+    def test_bad_value(self):
+        # The int converter can't take 'two', so this goes to url_for,
+        # which errors just as it always has.
+        items = [Item(id=1, name='one'), Item(id='two', name='two')]
+        with self.assertRaises(ValueError):
+            self.MyTable(items).__html__()
+
+    def test_none_value(self):
+        items = [Item(id=1, name='one'), Item(id=None, name='two')]
+        with self.assertRaises(BuildError):
+            self.MyTable(items).__html__()
+
+    def test_anchor_attrs_href(self):
+        class MyTable(Table):
+            view = LinkCol(
+                'View', 'view', url_kwargs=dict(id_='id'),
+                anchor_attrs={'href': '#{}', 'data-x': '{}'})
+
+        self.assert_in_html(
+            '<a data-x="{}" href="#{}">View</a>', MyTable([Item(id=1)]))
+
+
+class SortItemsTest(TableTest):
+
+    class MyTable(Table):
+        sort_items = True
+        name = Col('Name', sort_key=lambda v: v.lower())
+        number = Col('Number')
+        unsortable = Col('Unsortable', allow_sort=False)
+
+    items = [dict(name='b', number=2, unsortable=3),
+             dict(name='A', number=None, unsortable=1),
+             dict(name='c', number=1, unsortable=2),
+             dict(name='a', number=1, unsortable=4)]
+
+    def sorted_names(self, **kwargs):
+        tab = self.MyTable(self.items, **kwargs)
+        return [item['name'] for item in tab.get_items()]
+
+    def test_sort(self):
+        self.assertEqual(
+            self.sorted_names(sort_by='name'), ['A', 'a', 'b', 'c'])
+
+    def test_reverse(self):
+        self.assertEqual(
+            self.sorted_names(sort_by='name', sort_reverse=True),
+            ['c', 'b', 'A', 'a'])
+
+    def test_none_last(self):
+        self.assertEqual(
+            self.sorted_names(sort_by='number'), ['c', 'a', 'b', 'A'])
+        self.assertEqual(
+            self.sorted_names(sort_by='number', sort_reverse=True),
+            ['A', 'b', 'c', 'a'])
+
+    def test_multiple(self):
+        self.assertEqual(
+            self.sorted_names(sort_by=['number', 'name']),
+            ['a', 'c', 'b', 'A'])
+
+    def test_ignored(self):
+        names = ['b', 'A', 'c', 'a']
+        self.assertEqual(self.sorted_names(), names)
+        self.assertEqual(self.sorted_names(sort_by='unsortable'), names)
+        self.assertEqual(self.sorted_names(sort_by='nonexistent'), names)
+        self.assertEqual(
+            self.sorted_names(sort_by='name', sort_items=False), names)
+
+    def test_link_cols(self):
+        class MyTable(self.MyTable):
+            view = LinkCol('View', 'view', url_kwargs=dict(id_='number'))
+            named = LinkCol('Named', 'view', attr='name',
+                            url_kwargs=dict(id_='number'))
+
+        # A LinkCol without an attr shows no value from the item, so
+        # there is nothing to sort by.
+        tab = MyTable(self.items, sort_by='view')
+        self.assertEqual([item['name'] for item in tab.get_items()],
+                         ['b', 'A', 'c', 'a'])
+        tab = MyTable(self.items, sort_by=['view', 'named'])
+        self.assertEqual([item['name'] for item in tab.get_items()],
+                         ['A', 'a', 'b', 'c'])
+
+    def test_html(self):
+        tab = self.MyTable(self.items, sort_by='number')
+        html = html_reduce(tab.__html__())
+        self.assert_in(
+            '<td>c</td><td>1</td><td>2</td></tr>'
+            '<tr><td>a</td><td>1</td><td>4</td></tr>', html)
+
+    def test_columnar(self):
+        columns = {
+            'name': ['b', 'A', 'c', 'a'],
+            'number': [2, None, 1, 1],
+            'unsortable': [3, 1, 2, 4],
+        }
+        self.assertEqual(
+            ''.join(self.MyTable.from_columns(
+                columns, sort_by='number').iter_html(chunk_rows=3)),
+            self.MyTable(self.items, sort_by='number').__html__())
+
+    def test_limit(self):
+        self.assertEqual(
+            self.sorted_names(sort_by='name', limit=2), ['A', 'a'])
+        self.assertEqual(
+            self.sorted_names(sort_by='number', limit=3), ['c', 'a', 'b'])
+        self.assertEqual(self.sorted_names(limit=3), ['b', 'A', 'c'])
+        self.assertEqual(
+            self.sorted_names(sort_by='name', limit=10),
+            self.sorted_names(sort_by='name'))
+
+    def test_limit_matches_full_sort(self):
+        items = [dict(name=str(i % 7), number=i % 5, unsortable=i)
+                 for i in range(200)]
+        for sort_by in ['name', 'number', ['number', 'name']]:
+            for reverse in [False, True]:
+                full = self.MyTable(
+                    items, sort_by=sort_by, sort_reverse=reverse).get_items()
+                top = self.MyTable(
+                    items, sort_by=sort_by, sort_reverse=reverse,
+                    limit=20).get_items()
+                self.assertEqual(
+                    [item['unsortable'] for item in top],
+                    [item['unsortable'] for item in full[:20]])
+
+    def test_limit_columnar(self):
+        columns = {
+            'name': ['b', 'A', 'c', 'a'],
+            'number': [2, None, 1, 1],
+            'unsortable': [3, 1, 2, 4],
+        }
+        for sort_by in [None, 'number']:
+            self.assertEqual(
+                self.MyTable.from_columns(
+                    columns, sort_by=sort_by, limit=2).__html__(),
+                self.MyTable(
+                    self.items, sort_by=sort_by, limit=2).__html__())
+
+
+@unittest.skipIf(sqlalchemy is None, 'SQLAlchemy is not installed')
+class QueryTableTest(TableTest):
+
+    @classmethod
+    def setUpClass(cls):
+        from sqlalchemy import Column, ForeignKey, Integer, String, event
+        from sqlalchemy.orm import declarative_base, relationship, Session
+
+        Base = declarative_base()
+
+        class Country(Base):
+            __tablename__ = 'country'
+            id = Column(Integer, primary_key=True)
+            name = Column(String)
+            motto = Column(String)
+
+        class City(Base):
+            __tablename__ = 'city'
+            id = Column(Integer, primary_key=True)
+            name = Column(String)
+            country_id = Column(Integer, ForeignKey('country.id'))
+            country = relationship(Country)
+
+        class Person(Base):
+            __tablename__ = 'person'
+            id = Column(Integer, primary_key=True)
+            name = Column(String, nullable=False)
+            age = Column(Integer)
+            bio = Column(String)
+            city_id = Column(Integer, ForeignKey('city.id'))
+            city = relationship(City)
+
+        cls.Person = Person
+        engine = sqlalchemy.create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        cls.statements = []
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def record(conn, cursor, statement, *args):
+            cls.statements.append(statement)
+
+        session = Session(engine)
+        countries = [Country(name='C{}'.format(i), motto='M{}'.format(i))
+                     for i in range(3)]
+        cities = [City(name='T{}'.format(i), country=countries[i % 3])
+                  for i in range(5)]
+        ages = [30, None, 25, 30, 41, None, 19]
+        session.add_all([
+            Person(name='P{}'.format(i), age=age, bio='bio',
+                   city=cities[i % 5])
+            for i, age in enumerate(ages)])
+        session.commit()
+        session.close()
+        cls.engine = engine
+
+    def setUp(self):
+        from sqlalchemy.orm import Session
+        self.session = Session(self.engine)
+        del self.statements[:]
+
+    def tearDown(self):
+        self.session.close()
+
+    class MyTable(Table):
+        sort_items = True
+        name = Col('Name')
+        age = Col('Age')
+        city = Col('City', attr='city.name')
+        country = Col('Country', attr='city.country.name')
+
+    def make_table(self, query, **kwargs):
+        from flask_table.sqla import QueryTable
+        table_cls = type(str('QT'), (QueryTable, self.MyTable), {})
+        return table_cls(query, session=self.session, **kwargs)
+
+    def rows(self, table):
+        return [(item.name, item.age, item.city.name, item.city.country.name)
+                for item in table.get_items()]
+
+    def python_rows(self, **kwargs):
+        items = self.session.query(self.Person).order_by(self.Person.id)
+        return self.rows(self.MyTable(items.all(), **kwargs))
+
+    def test_matches_python(self):
+        from sqlalchemy import select
+        for kwargs in [dict(), dict(sort_by='age'),
+                       dict(sort_by='age', sort_reverse=True),
+                       dict(sort_by=['age', 'name'], sort_reverse=True),
+                       dict(sort_by='city', per_page=3, page=2),
+                       dict(sort_by='age', per_page=2, page=3),
+                       dict(sort_by='name', limit=4)]:
+            expected = self.python_rows(**kwargs)
+            for query in [self.session.query(self.Person),
+                          select(self.Person)]:
+                self.assertEqual(
+                    self.rows(self.make_table(query, **kwargs)), expected)
+
+    def test_pushdown(self):
+        tab = self.make_table(self.session.query(self.Person),
+                              sort_by='age', per_page=2, page=2)
+        self.assertEqual(self.rows(tab), [('P0', 30, 'T0', 'C0'),
+                                          ('P3', 30, 'T3', 'C0')])
+        # One query, that loads the cities and countries too, but not
+        # the bio.
+        self.assertEqual(len(self.statements), 1)
+        statement = self.statements[0]
+        self.assert_in('ORDER BY', statement)
+        self.assert_in('LIMIT', statement)
+        self.assert_in('JOIN country', statement)
+        self.assert_not_in('bio', statement)
+
+    def test_unknown_column_loads_everything(self):
+        from flask_table.sqla import QueryTable
+
+        class BioCol(Col):
+            def td_contents(self, item, attr_list):
+                return item.bio
+
+        class MyTable(QueryTable):
+            name = Col('Name')
+            bio = BioCol('Bio')
+
+        tab = MyTable(self.session.query(self.Person))
+        self.assertEqual(tab.__html__().count('<td>bio</td>'), 7)
+        self.assertEqual(len(self.statements), 1)
+
+    def test_select_count(self):
+        from sqlalchemy import select
+        tab = self.make_table(select(self.Person), per_page=3)
+        self.assertEqual(tab.get_page_count(), 3)
+
+    def test_sort_key_sorts_in_python(self):
+        from flask_table.sqla import QueryTable
+
+        class MyTable(QueryTable):
+            sort_items = True
+            name = Col('Name', sort_key=lambda name: name[::-1])
+
+        tab = MyTable(self.session.query(self.Person), sort_by='name',
+                      sort_reverse=True, limit=2)
+        self.assertEqual([item.name for item in tab.get_items()],
+                         ['P6', 'P5'])
+        self.assert_not_in('ORDER BY', self.statements[0])
+
+
+if sys.version_info >= (3, 6):
+    from .aio_tests import *  # noqa
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Tests for Table.aiter_html. These need Python 3.6 or later, so are
+only imported by the tests package when it is running on one.
+
+"""
+import asyncio
+
+from flask_table import Table, Col, ColumnarItems
+
+from . import TableTest
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+async def collect(agen):
+    return [chunk async for chunk in agen]
+
+
+async def aiter_items(items, delay=0):
+    for item in items:
+        await asyncio.sleep(delay)
+        yield item
+
+
+class AiterHtmlTest(TableTest):
+
+    class MyTable(Table):
+        name = Col('Name')
+        number = Col('Number')
+
+    items = [dict(name='n{}'.format(i), number=i) for i in range(7)]
+
+    def aiter_html(self, table, **kwargs):
+        return ''.join(run(collect(table.aiter_html(**kwargs))))
+
+    def test_same_as_html(self):
+        for items in [self.items, iter(self.items), []]:
+            self.assertEqual(
+                self.aiter_html(self.MyTable(items), chunk_rows=3),
+                self.MyTable(self.items if items else []).__html__())
+
+    def test_async_items(self):
+        html = self.aiter_html(
+            self.MyTable(aiter_items(self.items)), chunk_rows=3)
+        self.assertEqual(html, self.MyTable(self.items).__html__())
+
+    def test_async_items_empty(self):
+        self.assertEqual(
+            self.aiter_html(self.MyTable(aiter_items([]))),
+            self.MyTable([]).__html__())
+
+    def test_chunks_as_items_arrive(self):
+        read = []
+
+        async def items():
+            for item in self.items:
+                read.append(item)
+                yield item
+
+        async def first_chunks():
+            chunks = self.MyTable(items()).aiter_html(chunk_rows=2)
+            out = []
+            async for chunk in chunks:
+                out.append((chunk, len(read)))
+                if len(out) == 3:
+                    break
+            return out
+
+        out = run(first_chunks())
+        # The opening tags, then the first two chunks of rows, each
+        # rendered once its items had been read.
+        self.assertEqual([n for _, n in out], [2, 2, 4])
+        self.assertIn('<td>n1</td>', out[1][0])
+
+    def test_async_items_paginated(self):
+        class MyTable(self.MyTable):
+            per_page = 3
+
+            def page_url(self, page):
+                return '?page={}'.format(page)
+
+        for kwargs in [dict(page=2), dict(page=3),
+                       dict(page=1, sort_items=True, sort_by='number',
+                            sort_reverse=True),
+                       dict(page=2, sort_items=True, sort_by='number')]:
+            # The same as for an iterator, where the pager doesn't know
+            # how many pages there are.
+            self.assertEqual(
+                self.aiter_html(MyTable(aiter_items(self.items), **kwargs)),
+                ''.join(MyTable(iter(self.items), **kwargs).iter_html()))
+
+    def test_async_td_contents(self):
+        class AsyncCol(Col):
+            async def td_contents(self, item, attr_list):
+                await asyncio.sleep(0.05)
+                return '<b>{}</b>'.format(item['name'])
+
+        class MyTable(self.MyTable):
+            bold = AsyncCol('Bold', td_html_attrs={'class': 'b'})
+
+        loop = asyncio.new_event_loop()
+        try:
+            start = loop.time()
+            html = ''.join(loop.run_until_complete(
+                collect(MyTable(self.items).aiter_html())))
+            elapsed = loop.time() - start
+        finally:
+            loop.close()
+        self.assertIn(
+            '<tr><td>n3</td><td>3</td><td class="b"><b>n3</b></td></tr>',
+            html)
+        # The cells were awaited together, not one after another.
+        self.assertLess(elapsed, 0.05 * len(self.items))
+
+    def test_columnar(self):
+        columns = {'name': ['a', 'b'], 'number': [1, 2]}
+        self.assertEqual(
+            self.aiter_html(self.MyTable.from_columns(columns)),
+            self.MyTable.from_columns(columns).__html__())
+
+    def test_row_cache(self):
+        class MyTable(self.MyTable):
+            row_cache_size = 10
+
+            def row_cache_key(self, item):
+                return item['number']
+
+        html = self.aiter_html(MyTable(aiter_items(self.items)))
+        self.assertEqual(len(MyTable.get_row_cache()), 7)
+        self.assertEqual(
+            self.aiter_html(MyTable(aiter_items(self.items))), html)
+        self.assertEqual(MyTable.get_row_cache().hits, 7)